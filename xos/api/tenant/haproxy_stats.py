@@ -0,0 +1,122 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import threading
+import time
+
+# The synchronizer publishes the port of each loadbalancer's operator level
+# runtime API in this tag on its instance, empty while the API is closed.
+# It is only open to the sources in the synchronizer's
+# LBAAS_STATS_API_SOURCES, which must include this host.
+STATS_API_TAG = "haproxy_stats_api_port"
+
+# Time a stats request may spend on all loadbalancers together, and the
+# number queried at once.
+STATS_TIMEOUT = 2.0
+MAX_PARALLEL = 16
+
+# "show stat" columns reported per frontend, with the names they are
+# returned under.
+FRONTEND_STATS = (("bin", "bytes_in"),
+                  ("bout", "bytes_out"),
+                  ("scur", "active_connections"),
+                  ("stot", "total_connections"),
+                  ("ereq", "request_errors"),
+                  ("cache_lookups", "cache_lookups"),
+                  ("cache_hits", "cache_hits"))
+
+
+def show_stat(host, port, timeout=2.0):
+    """Returns the rows of "show stat" as dicts keyed by column name."""
+    sock = socket.create_connection((host, port), timeout)
+    try:
+        sock.sendall(b"show stat\n")
+        chunks = []
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                break
+            chunks.append(data)
+    finally:
+        sock.close()
+
+    lines = b"".join(chunks).decode("utf-8", "replace").splitlines()
+    if not lines or not lines[0].startswith("# "):
+        raise IOError("unexpected reply to show stat from %s:%d" % (host, port))
+
+    columns = lines[0][2:].split(",")
+    return [dict(zip(columns, line.split(","))) for line in lines[1:] if line]
+
+
+def get_frontend_stats(host, port, frontend, timeout=STATS_TIMEOUT):
+    for row in show_stat(host, port, timeout):
+        if row.get("pxname") == frontend and row.get("svname") == "FRONTEND":
+            stats = {}
+            for column, name in FRONTEND_STATS:
+                value = row.get(column)
+                stats[name] = int(value) if value else 0
+            stats["cache_misses"] = stats["cache_lookups"] - stats["cache_hits"]
+            return stats
+
+    return None
+
+
+def collect_frontend_stats(hosts, frontend, timeout=STATS_TIMEOUT):
+    """Runs get_frontend_stats for every (host, port) in hosts in parallel
+    and returns the results in the same order. A host that failed, or did
+    not answer within `timeout` seconds of the call, gets the exception
+    instead."""
+    results = [None] * len(hosts)
+    done = [False] * len(hosts)
+    todo = list(range(len(hosts)))
+    lock = threading.Lock()
+    deadline = time.time() + timeout
+
+    def worker():
+        while True:
+            with lock:
+                if not todo:
+                    return
+                index = todo.pop()
+
+            try:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise socket.timeout("timed out")
+                host, port = hosts[index]
+                result = get_frontend_stats(host, port, frontend, remaining)
+            except Exception as err:
+                result = err
+
+            with lock:
+                results[index] = result
+                done[index] = True
+
+    threads = []
+    for i in range(min(MAX_PARALLEL, len(hosts))):
+        thread = threading.Thread(target=worker, name="haproxy_stats")
+        thread.daemon = True
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join(max(0, deadline - time.time()))
+
+    with lock:
+        for index in range(len(hosts)):
+            if not done[index]:
+                results[index] = socket.timeout("no answer within %.1fs" % timeout)
+        return list(results)
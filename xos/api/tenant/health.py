@@ -27,7 +27,11 @@ from django.conf import settings
 from xos.apibase import XOSListCreateAPIView, XOSRetrieveUpdateDestroyAPIView, XOSPermissionDenied
 from api.xosapi_helpers import PlusModelSerializer, XOSViewSet, ReadOnlyField
 from xos.logger import Logger, logging
-from services.lbaas.models import LbService, Loadbalancer, Listener, Pool, Member, Healthmonitor
+from message_log import MessageLogMixin
+from list_query import ListQueryMixin
+from lb_resync import resync_queue
+from pool import update_pool_status
+from services.lbaas.models import LbService, Loadbalancer, Listener, Pool, Member, Healthmonitor, LoadbalancerListener
 import json
 import uuid
 import traceback
@@ -52,19 +56,21 @@ class CsrfExemptSessionAuthentication(SessionAuthentication):
 
 def update_loadbalancer_model(health_monitor_id):
     health = Healthmonitor.objects.get(health_monitor_id=health_monitor_id)
-    pools = Pool.objects.filter(health_monitor_id=health.id)
+    lb_ids = set(Loadbalancer.objects.filter(pool__health_monitor=health.id).values_list('id', flat=True))
+    lb_ids.update(LoadbalancerListener.objects.filter(default_pool__health_monitor=health.id).values_list('loadbalancer_id', flat=True))
 
-    for pool in pools:
-        lbs = Loadbalancer.objects.filter(pool_id=pool.id)
+    if len(lb_ids) == 0:
+        logger.info("health_monitor_id is not used by any Loadbalancer (health_monitor_id=%s)" % health.id)
+        return
 
-        for lb in lbs:
-            lb.save(always_update_timestamp=True)
+    resync_queue.touch(lb_ids)
 
-        if lbs.count() == 0:
-            logger.info("pool_id does not exist in Loadbalancer table (pool_id=%s)" % pool.id)
 
-    if pools.count() == 0:
-        logger.info("health_monitor_id does not exist in Pool table (health_monitor_id=%s)" % health.id)
+def update_pools_status(health):
+    # Pool status depends on the pool's health monitor, so it is recomputed
+    # whenever the monitor changes or goes away.
+    for pool in Pool.objects.filter(health_monitor_id=health.id):
+        update_pool_status(pool.pool_id)
 
 
 class HealthSerializer(PlusModelSerializer):
@@ -75,7 +81,7 @@ class HealthSerializer(PlusModelSerializer):
         fields = ('id', 'name', 'type', 'delay', 'max_retries', 'timeout', 'http_method', 'admin_state_up', 'url_path', 'expected_codes')
 
 
-class HealthViewSet(XOSViewSet):
+class HealthViewSet(MessageLogMixin, ListQueryMixin, XOSViewSet):
     authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication)
 
     base_name = "healthmonitors"
@@ -84,26 +90,15 @@ class HealthViewSet(XOSViewSet):
     queryset = Healthmonitor.objects.all()
     serializer_class = HealthSerializer
 
+    list_id_field = "health_monitor_id"
+    list_filter_fields = ("name", "type")
+
     @classmethod
     def get_urlpatterns(self, api_path="^"):
         patterns = super(HealthViewSet, self).get_urlpatterns(api_path=api_path)
 
         return patterns
 
-    def print_message_log(self, msg_type, http):
-        if msg_type == "REQ":
-            logger.info("###################################################")
-            logger.info("[Server] <--- [Client]")
-            logger.info("METHOD=%s" % http.method)
-            logger.info("URI=%s" % http.path)
-            logger.info("%s\n" % http.data)
-        elif msg_type == "RSP":
-            logger.info("[Server] ---> [Client]")
-            logger.info("%s" % http)
-            logger.info("Send http rsponse Success..\n")
-        else:
-            logger.error("Invalid msg_type(%s)" % msg_type)
-
     def get_rsp_body(self, health_monitor_id):
         health = Healthmonitor.objects.get(health_monitor_id=health_monitor_id)
 
@@ -191,24 +186,27 @@ class HealthViewSet(XOSViewSet):
 
     # GET: /api/tenant/healthmonitors
     def list(self, request):
-        self.print_message_log("REQ", request)
-        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            healths = list(self.filter_list_queryset(request, self.filter_queryset(self.get_queryset())))
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
 
         root_obj = {}
         health_list = []
-        root_obj['health_monitors'] = health_list
 
-        for health in queryset:
+        for health in healths:
             temp_obj, health_obj = self.get_rsp_body(health.health_monitor_id)
             health_list.append(health_obj)
 
-        self.print_message_log("RSP", root_obj)
+        root_obj['health_monitors'] = self.project_list_fields(request, health_list)
+        next_marker = self.get_next_marker(request, healths)
+        if next_marker:
+            root_obj['next_marker'] = next_marker
+
         return Response(root_obj)
 
     # POST: /api/tenant/healthmonitors
     def create(self, request):
-        self.print_message_log("REQ", request)
-
         health = Healthmonitor()
         health.health_monitor_id = str(uuid.uuid4())
 
@@ -218,28 +216,21 @@ class HealthViewSet(XOSViewSet):
 
         rsp_data, health_obj = self.get_rsp_body(health.health_monitor_id)
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(health.health_monitor_id,))
-        lb_thr.start()
+        update_loadbalancer_model(health.health_monitor_id)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_201_CREATED)
 
     # GET: /api/tenant/healthmonitors/{health_monitor_id}
     def retrieve(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         if self.check_health_monitor_id(pk) is None:
             return Response("Error: health_monitor_id does not exist in Healthmonitor table", status=status.HTTP_404_NOT_FOUND)
 
         rsp_data, health_obj = self.get_rsp_body(pk)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data)
 
     # PUT: /api/tenant/healthmonitors/{health_monitor_id}
     def update(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         health = self.check_health_monitor_id(pk)
         if health is None:
             return Response("Error: health_monitor_id does not exist in Healthmonitor table", status=status.HTTP_404_NOT_FOUND)
@@ -250,16 +241,13 @@ class HealthViewSet(XOSViewSet):
 
         rsp_data, health_obj = self.get_rsp_body(pk)
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pk,))
-        lb_thr.start()
+        update_pools_status(health)
+        update_loadbalancer_model(pk)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_202_ACCEPTED)
 
     # DELETE: /api/tenant/healthmonitors/{health_monitor_id}
     def destroy(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         health = self.check_health_monitor_id(pk)
         if health is None:
             return Response("Error: health_monitor_id does not exist in Healthmonitor table", status=status.HTTP_404_NOT_FOUND)
@@ -270,10 +258,10 @@ class HealthViewSet(XOSViewSet):
         except Exception as err:
             logger.error("%s" % str(err))
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pk,))
-        lb_thr.start()
+        update_loadbalancer_model(pk)
 
         Healthmonitor.objects.filter(health_monitor_id=pk).delete()
 
-        self.print_message_log("RSP", "")
+        update_pools_status(health)
+
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,115 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from xos.logger import Logger, logging
+from django.db import close_old_connections
+from django.utils import timezone
+from services.lbaas.models import Loadbalancer
+import threading
+import time
+
+logger = Logger(level=logging.INFO)
+
+RESYNC_DELAY = 1.0
+
+
+class LoadbalancerResyncQueue(object):
+    """Coalesces requests to re-sync Loadbalancers.
+
+    Listener, pool, member and health monitor changes only reach the
+    synchronizer when the owning Loadbalancer's `updated` moves. touch()
+    queues the Loadbalancer ids; a single worker thread moves it for all
+    the ones that are due with one UPDATE, RESYNC_DELAY seconds after each
+    was first touched, no matter how many times it was touched in between."""
+
+    def __init__(self, delay=RESYNC_DELAY):
+        self.delay = delay
+        self.cond = threading.Condition()
+        self.pending = {}
+        self.worker = None
+        self.touches = 0
+        self.saves = 0
+
+    def touch(self, lb_ids):
+        with self.cond:
+            deadline = time.time() + self.delay
+            for lb_id in lb_ids:
+                self.touches += 1
+                if lb_id not in self.pending:
+                    self.pending[lb_id] = deadline
+
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run, name="lb_resync")
+                self.worker.daemon = True
+                self.worker.start()
+
+            self.cond.notify()
+
+    def stats(self):
+        with self.cond:
+            stats = {}
+            stats['queue_depth'] = len(self.pending)
+            stats['touches'] = self.touches
+            stats['saves'] = self.saves
+            stats['coalescing_ratio'] = float(self.touches) / self.saves if self.saves else 0.0
+            return stats
+
+    def run(self):
+        while True:
+            due = []
+            try:
+                with self.cond:
+                    while not self.pending:
+                        self.cond.wait()
+
+                    now = time.time()
+                    due = [lb_id for lb_id, deadline in self.pending.items() if deadline <= now]
+                    if not due:
+                        self.cond.wait(min(self.pending.values()) - now)
+                        continue
+
+                    for lb_id in due:
+                        del self.pending[lb_id]
+
+                # This thread outlives the requests that touch it, so the
+                # connections Django would close after a request are
+                # checked here.
+                close_old_connections()
+                self.flush(due)
+            except Exception as err:
+                # Retry the batch rather than lose it or the worker. It was
+                # already counted when it was touched.
+                logger.error("Resync failed, retrying %s - %s" % (due, str(err)))
+                self.requeue(due)
+
+    def requeue(self, lb_ids):
+        with self.cond:
+            deadline = time.time() + self.delay
+            for lb_id in lb_ids:
+                self.pending.setdefault(lb_id, deadline)
+
+    def flush(self, lb_ids):
+        # The synchronizer syncs a Loadbalancer whose `updated` is newer than
+        # its `enacted`, and sync_config's change feed keys on `updated` too,
+        # so a single UPDATE of that column stands in for a save() per LB.
+        saved = Loadbalancer.objects.filter(id__in=lb_ids).update(updated=timezone.now())
+
+        with self.cond:
+            self.saves += saved
+
+        logger.info("Resynced %d loadbalancer(s) %s" % (saved, self.stats()))
+
+
+resync_queue = LoadbalancerResyncQueue()
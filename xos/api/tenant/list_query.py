@@ -0,0 +1,72 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+class ListQueryMixin(object):
+    """Query parameters shared by the tenant list endpoints.
+
+    limit/marker give keyset pagination on list_id_field, so a page is a
+    range scan instead of a full table read. Any of list_filter_fields
+    given as a query parameter is pushed down as an equality filter, and
+    fields= trims every returned object to the named keys."""
+
+    list_id_field = None
+    list_filter_fields = ()
+    max_list_limit = 1000
+
+    def get_list_limit(self, request):
+        limit = request.query_params.get("limit")
+        if limit is None or limit == "":
+            return None
+
+        limit = int(limit)
+        if limit <= 0:
+            raise ValueError("limit must be a positive integer")
+
+        return min(limit, self.max_list_limit)
+
+    def filter_list_queryset(self, request, queryset):
+        for field in self.list_filter_fields:
+            value = request.query_params.get(field)
+            if value is not None:
+                queryset = queryset.filter(**{field: value})
+
+        queryset = queryset.order_by(self.list_id_field)
+
+        marker = request.query_params.get("marker")
+        if marker:
+            queryset = queryset.filter(**{self.list_id_field + "__gt": marker})
+
+        limit = self.get_list_limit(request)
+        if limit is not None:
+            queryset = queryset[:limit]
+
+        return queryset
+
+    def project_list_fields(self, request, obj_list):
+        fields = request.query_params.get("fields")
+        if not fields:
+            return obj_list
+
+        wanted = set(field.strip() for field in fields.split(","))
+        return [dict((k, v) for k, v in obj.items() if k in wanted) for obj in obj_list]
+
+    def get_next_marker(self, request, objs):
+        # Only a full page can be followed by another one.
+        limit = self.get_list_limit(request)
+        if limit is None or len(objs) < limit:
+            return None
+
+        return getattr(objs[-1], self.list_id_field)
@@ -24,11 +24,18 @@ from rest_framework.authentication import *
 from core.models import *
 from django.forms import widgets
 from django.conf import settings
+from django.db.models import Q
 from xos.apibase import XOSListCreateAPIView, XOSRetrieveUpdateDestroyAPIView, XOSPermissionDenied
 from api.xosapi_helpers import PlusModelSerializer, XOSViewSet, ReadOnlyField
 from xos.logger import Logger, logging
-from services.lbaas.models import LbService, Loadbalancer, Listener, Pool, Member, Healthmonitor
+from message_log import MessageLogMixin
+from list_query import ListQueryMixin
+from tuning_fields import TuningFieldsMixin, MAX_TIMEOUT, MAX_CONNECTIONS
+from lb_resync import resync_queue
+import haproxy_stats
+from services.lbaas.models import LbService, Loadbalancer, Listener, Pool, Member, Healthmonitor, LoadbalancerListener
 import json
+import re
 import uuid
 import traceback
 import time
@@ -37,6 +44,9 @@ import threading
 logger = Logger(level=logging.INFO)
 settings.DEBUG = False
 
+TLS_REF_PATTERN = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]*\Z")
+CONTENT_TYPE_PATTERN = re.compile(r"^[A-Za-z0-9.+-]+/[A-Za-z0-9.+*-]+$")
+
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
     def enforce_csrf(self, request):
@@ -51,12 +61,14 @@ def get_default_lb_service():
 
 
 def update_loadbalancer_model(listener_id):
-    lbs = Loadbalancer.objects.filter(ptr_listener_id=listener_id)
-    for lb in lbs:
-        lb.save(always_update_timestamp=True)
+    lb_ids = set(Loadbalancer.objects.filter(ptr_listener_id=listener_id).values_list('id', flat=True))
+    lb_ids.update(LoadbalancerListener.objects.filter(listener__listener_id=listener_id).values_list('loadbalancer_id', flat=True))
 
-    if lbs.count() == 0:
+    if len(lb_ids) == 0:
         logger.info("ptr_listener_id(%s) does not exist in Loadbalancer table" % listener_id)
+        return
+
+    resync_queue.touch(lb_ids)
 
 
 class ListenerSerializer(PlusModelSerializer):
@@ -64,10 +76,12 @@ class ListenerSerializer(PlusModelSerializer):
 
     class Meta:
         model = Listener
-        fields = ('id', 'name', 'protocol', 'protocol_port', 'stat_port', 'admin_state_up', 'connection_limit', 'description')
+        fields = ('id', 'name', 'protocol', 'protocol_port', 'stat_port', 'admin_state_up', 'connection_limit', 'description',
+                  'timeout_client_data', 'keepalive_mode', 'default_tls_container_ref',
+                  'cache_size_mb', 'cache_max_age', 'cache_max_object_size', 'compression_types')
 
 
-class ListenerViewSet(XOSViewSet):
+class ListenerViewSet(MessageLogMixin, ListQueryMixin, TuningFieldsMixin, XOSViewSet):
     authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication)
 
     base_name = "listeners"
@@ -76,25 +90,27 @@ class ListenerViewSet(XOSViewSet):
     queryset = Listener.objects.all()
     serializer_class = ListenerSerializer
 
+    list_id_field = "listener_id"
+    list_filter_fields = ("name", "protocol", "protocol_port")
+
+    # connection_limit is rendered as the frontend maxconn; -1 leaves the
+    # frontend bounded only by the loadbalancer's max_connections.
+    # cache_size_mb 0 disables the response cache; haproxy caps a cache at
+    # 4095 megabytes.
+    tuning_int_fields = {"connection_limit": (-1, MAX_CONNECTIONS),
+                         "timeout_client_data": (1, MAX_TIMEOUT),
+                         "cache_size_mb": (0, 4095),
+                         "cache_max_age": (1, 86400),
+                         "cache_max_object_size": (0, 2147483647)}
+    tuning_choice_fields = {"keepalive_mode": ("KEEP_ALIVE", "SERVER_CLOSE", "CLOSE")}
+
     @classmethod
     def get_urlpatterns(self, api_path="^"):
         patterns = super(ListenerViewSet, self).get_urlpatterns(api_path=api_path)
 
-        return patterns
+        patterns.append(self.detail_url("stats/$", {"get": "get_listener_stats"}, "listener_stats"))
 
-    def print_message_log(self, msg_type, http):
-        if msg_type == "REQ":
-            logger.info("###################################################")
-            logger.info("[Server] <--- Client]")
-            logger.info("METHOD=%s" % http.method)
-            logger.info("URI=%s" % http.path)
-            logger.info("%s\n" % http.data)
-        elif msg_type == "RSP":
-            logger.info("[Server] ---> [Client]")
-            logger.info("%s" % http)
-            logger.info("Send http rsponse Success..\n")
-        else:
-            logger.error("Invalid msg_type(%s)" % msg_type)
+        return patterns
 
     def get_rsp_body(self, listener_id):
         listener = Listener.objects.get(listener_id=listener_id)
@@ -106,11 +122,18 @@ class ListenerViewSet(XOSViewSet):
 
         listener_obj['admin_state_up'] = listener.admin_state_up
         listener_obj['connection_limit'] = listener.connection_limit
+        listener_obj['timeout_client_data'] = listener.timeout_client_data
+        listener_obj['keepalive_mode'] = listener.keepalive_mode
+        listener_obj['default_tls_container_ref'] = listener.default_tls_container_ref
+        listener_obj['cache_size_mb'] = listener.cache_size_mb
+        listener_obj['cache_max_age'] = listener.cache_max_age
+        listener_obj['cache_max_object_size'] = listener.cache_max_object_size
+        listener_obj['compression_types'] = listener.compression_types
         listener_obj['description'] = listener.description
         listener_obj['listener_id'] = listener.listener_id
 
         listener_obj['loadbalancers'] = lb_obj_list
-        lbs = Loadbalancer.objects.filter(listener_id=listener.id)
+        lbs = Loadbalancer.objects.filter(Q(listener_id=listener.id) | Q(loadbalancer_listeners__listener=listener.id)).distinct()
         for lb in lbs:
             lb_obj = {}
             lb_obj['id'] = lb.loadbalancer_id
@@ -152,8 +175,6 @@ class ListenerViewSet(XOSViewSet):
                 listener.description = request.data["description"]
             if 'admin_state_up' in request.data and request.data["admin_state_up"]:
                 listener.admin_state_up = request.data["admin_state_up"]
-            if 'connection_limit' in request.data and request.data["connection_limit"]:
-                listener.connection_limit = request.data["connection_limit"]
         except KeyError as err:
             logger.error("JSON Key error: %s" % str(err))
             return None
@@ -161,6 +182,48 @@ class ListenerViewSet(XOSViewSet):
         listener.save()
         return listener
 
+    # haproxy refuses a max-object-size above half of total-max-size, and
+    # the config would then never be loaded. Checked on the values the
+    # listener ends up with, since either field may come alone.
+    def check_cache_fields(self, listener):
+        if listener.cache_size_mb <= 0:
+            return
+
+        limit = listener.cache_size_mb * 1024 * 1024 // 2
+        if listener.cache_max_object_size > limit:
+            raise ValueError("cache_max_object_size must not exceed half of cache_size_mb (%d bytes)" % limit)
+
+    # default_tls_container_ref names <ref>.pem in the synchronizer's
+    # certificate store, so it has to be a plain file name. An HTTPS
+    # listener terminates TLS and cannot do without one.
+    def apply_tls_fields(self, request, listener):
+        if 'default_tls_container_ref' in request.data:
+            ref = request.data["default_tls_container_ref"] or ""
+            if ref and not TLS_REF_PATTERN.match(ref):
+                raise ValueError("default_tls_container_ref may only contain letters, digits, '.', '_' and '-'")
+            listener.default_tls_container_ref = ref
+
+        protocol = request.data.get("protocol") or listener.protocol
+        if protocol.upper() == "HTTPS" and not listener.default_tls_container_ref:
+            raise ValueError("HTTPS listener needs a default_tls_container_ref")
+
+    # compression_types is a list of content types, given either as a JSON
+    # list or as a space or comma separated string, and stored space
+    # separated as haproxy's "compression type" expects it.
+    def apply_compression_fields(self, request, listener):
+        if 'compression_types' not in request.data:
+            return
+
+        types = request.data["compression_types"] or []
+        if not isinstance(types, list):
+            types = str(types).replace(",", " ").split()
+
+        for content_type in types:
+            if not CONTENT_TYPE_PATTERN.match(content_type):
+                raise ValueError("compression_types has an invalid content type (%s)" % content_type)
+
+        listener.compression_types = " ".join(types)
+
     def check_listener_id(self, listener_id):
         try:
             listener = Listener.objects.get(listener_id=listener_id)
@@ -171,75 +234,83 @@ class ListenerViewSet(XOSViewSet):
 
     # GET: /api/tenant/listeners
     def list(self, request):
-        self.print_message_log("REQ", request)
-        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            listeners = list(self.filter_list_queryset(request, self.filter_queryset(self.get_queryset())))
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
 
         root_obj = {}
         listener_obj_list = []
-        root_obj['listeners'] = listener_obj_list
 
-        for listener in queryset:
+        for listener in listeners:
             temp_obj, listener_obj = self.get_rsp_body(listener.listener_id)
             listener_obj_list.append(listener_obj)
 
-        self.print_message_log("RSP", root_obj)
+        root_obj['listeners'] = self.project_list_fields(request, listener_obj_list)
+        next_marker = self.get_next_marker(request, listeners)
+        if next_marker:
+            root_obj['next_marker'] = next_marker
+
         return Response(root_obj)
 
     # POST: /api/tenant/listeners
     def create(self, request):
-        self.print_message_log("REQ", request)
-
         listener = Listener()
         listener.listener_id = str(uuid.uuid4())
 
+        try:
+            self.apply_tuning_fields(request, listener)
+            self.check_cache_fields(listener)
+            self.apply_tls_fields(request, listener)
+            self.apply_compression_fields(request, listener)
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
+
         listener = self.update_listener_info(listener, request)
         if listener is None:
             return Response("Error: Mandatory fields not exist!", status=status.HTTP_400_BAD_REQUEST)
 
         rsp_data, listener_obj = self.get_rsp_body(listener.listener_id)
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(listener.listener_id,))
-        lb_thr.start()
+        update_loadbalancer_model(listener.listener_id)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_201_CREATED)
 
     # GET: /api/tenant/listeners/{listener_id}
     def retrieve(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         if self.check_listener_id(pk) is None:
             return Response("Error: listener_id does not exist in Listener table", status=status.HTTP_404_NOT_FOUND)
 
         rsp_data, listener_obj = self.get_rsp_body(pk)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data)
 
     # PUT: /api/tenant/listeners/{listener_id}
     def update(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         listener = self.check_listener_id(pk)
         if listener is None:
             return Response("Error: listener_id does not exist in Listener table", status=status.HTTP_404_NOT_FOUND)
 
+        try:
+            self.apply_tuning_fields(request, listener)
+            self.check_cache_fields(listener)
+            self.apply_tls_fields(request, listener)
+            self.apply_compression_fields(request, listener)
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
+
         listener = self.update_listener_info(listener, request)
         if listener is None:
             return Response("Error: Mandatory fields not exist!", status=status.HTTP_400_BAD_REQUEST)
 
         rsp_data, listener_obj = self.get_rsp_body(pk)
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pk,))
-        lb_thr.start()
+        update_loadbalancer_model(pk)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_202_ACCEPTED)
 
     # DELETE: /api/tenant/listeners/{listener_id}
     def destroy(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         listener = self.check_listener_id(pk)
         if listener is None:
             return Response("Error: listener_id does not exist in Listener table", status=status.HTTP_404_NOT_FOUND)
@@ -250,10 +321,66 @@ class ListenerViewSet(XOSViewSet):
         except Exception as err:
             logger.error("%s" % str(err))
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pk,))
-        lb_thr.start()
+        if LoadbalancerListener.objects.filter(listener_id=listener.id).exists():
+            return Response("Error: There is a loadbalancer that uses listener_id", status=status.HTTP_404_NOT_FOUND)
+
+        update_loadbalancer_model(pk)
 
         Listener.objects.filter(listener_id=pk).delete()
 
-        self.print_message_log("RSP", "")
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    # GET: /api/tenant/listeners/{listener_id}/stats
+    def get_listener_stats(self, request, pk=None):
+        listener = self.check_listener_id(pk)
+        if listener is None:
+            return Response("Error: listener_id does not exist in Listener table", status=status.HTTP_404_NOT_FOUND)
+
+        # Counters are read live from the haproxy of every loadbalancer that
+        # serves the listener, all at once and within STATS_TIMEOUT, and
+        # summed up.
+        totals = dict((name, 0) for column, name in haproxy_stats.FRONTEND_STATS)
+        totals['cache_misses'] = 0
+        lb_obj_list = []
+
+        lbs = list(Loadbalancer.objects.filter(Q(listener_id=listener.id) | Q(loadbalancer_listeners__listener=listener.id)).distinct())
+
+        # Only loadbalancers whose synchronizer published a stats API port
+        # are queried.
+        tags = Tag.objects.filter(name=haproxy_stats.STATS_API_TAG,
+                                  object_id__in=[lb.instance_id for lb in lbs if lb.instance_id is not None])
+        ports = dict((tag.object_id, int(tag.value)) for tag in tags if tag.value.isdigit())
+        reachable = [lb for lb in lbs if lb.instance_id in ports]
+        results = haproxy_stats.collect_frontend_stats([(lb.vip_address, ports[lb.instance_id]) for lb in reachable],
+                                                       listener.listener_id)
+        results = dict(zip([lb.id for lb in reachable], results))
+
+        for lb in lbs:
+            lb_obj = {}
+            lb_obj['id'] = lb.loadbalancer_id
+            lb_obj_list.append(lb_obj)
+
+            if lb.id not in results:
+                lb_obj['error'] = "stats API is not enabled"
+                continue
+
+            stats = results[lb.id]
+            if isinstance(stats, Exception):
+                logger.error("%s (loadbalancer_id=%s)" % (str(stats), lb.loadbalancer_id))
+                stats = None
+
+            if stats is None:
+                lb_obj['error'] = "stats are not available"
+                continue
+
+            lb_obj.update(stats)
+            for name, value in stats.items():
+                totals[name] += value
+
+        root_obj = {}
+        stats_obj = dict(totals)
+        root_obj['stats'] = stats_obj
+        stats_obj['listener_id'] = listener.listener_id
+        stats_obj['loadbalancers'] = lb_obj_list
+
+        return Response(root_obj)
@@ -27,7 +27,12 @@ from django.conf import settings
 from xos.apibase import XOSListCreateAPIView, XOSRetrieveUpdateDestroyAPIView, XOSPermissionDenied
 from api.xosapi_helpers import PlusModelSerializer, XOSViewSet, ReadOnlyField
 from xos.logger import Logger, logging
-from services.lbaas.models import LbService, Loadbalancer, Listener, Pool, Member, Healthmonitor
+from message_log import MessageLogMixin
+from list_query import ListQueryMixin
+from tuning_fields import TuningFieldsMixin, MAX_CONNECTIONS
+from lb_resync import resync_queue
+from model_integrity import find_model_violations
+from services.lbaas.models import LbService, Loadbalancer, Listener, Pool, Member, Healthmonitor, LoadbalancerListener
 import json
 import uuid
 import traceback
@@ -87,63 +92,21 @@ def check_loadbalancer_model_info(lb_id):
 def check_loadbalancer_model_all_info():
     logger.info("###################################################")
 
-    logger.info("[Loadbalancer] check start")
-    lbs = Loadbalancer.objects.all()
-    for lb in lbs:
-        listeners = Listener.objects.filter(id=lb.listener_id)
-        if listeners.count() == 0:
-            logger.error("Listener information does not exist (id=%s)" % lb.listener_id)
-            return "Error"
-
-        pools = Pool.objects.filter(id=lb.pool_id)
-        if pools.count() == 0:
-            logger.error("Pool information does not exist (id=%s)" % lb.pool_id)
-            return "Error"
-
-    logger.info("[Listener] check start")
-    listeners = Listener.objects.all()
-    for listener in listeners:
-        lbs = Loadbalancer.objects.filter(listener=listener.id)
-        if lbs.count() == 0:
-            logger.error("Loadbalancer information does not exist (listener_id=%s)" % listener.id)
-            return "Error"
-
-    logger.info("[Pool] check start")
-    pools = Pool.objects.all()
-    for pool in pools:
-        lbs = Loadbalancer.objects.filter(pool=pool.id)
-        if lbs.count() == 0:
-            logger.error("Loadbalancer information does not exist (pool_id=%s)" % pool.id)
-            return "Error"
-
-        members = Member.objects.filter(memberpool_id=pool.id)
-        if members.count() == 0:
-            logger.error("Member information does not exist (memberpool_id=%s)" % pool.id)
-            return "Error"
+    # Only the id and foreign-key columns of the six tables are loaded,
+    # once each; find_model_violations then only does set and dict lookups.
+    lbs = list(Loadbalancer.objects.values_list('loadbalancer_id', 'listener_id', 'pool_id'))
+    listeners = dict(Listener.objects.values_list('id', 'listener_id'))
+    pools = list(Pool.objects.values_list('id', 'pool_id', 'health_monitor_id'))
+    members = list(Member.objects.values_list('member_id', 'memberpool_id'))
+    healths = dict(Healthmonitor.objects.values_list('id', 'health_monitor_id'))
+    bindings = list(LoadbalancerListener.objects.values_list('loadbalancer_id', 'listener_id', 'default_pool_id'))
 
-        try:
-            health = Healthmonitor.objects.get(id=pool.health_monitor_id)
-        except Exception as err:
-            logger.error("Health information does not exist (health_monitor_id=%s)" % pool.health_monitor_id)
-            return "Error"
+    violations = find_model_violations(lbs, listeners, pools, members, healths, bindings)
 
-    logger.info("[Member] check start")
-    members = Member.objects.all()
-    for member in members:
-        pools = Pool.objects.filter(id=member.memberpool_id)
-        if pools.count() == 0:
-            logger.error("Pool information does not exist (id=%s)" % member.memberpool_id)
-            return "Error"
+    for violation in violations:
+        logger.error(violation)
 
-    logger.info("[Healthmonitor] check start")
-    healths = Healthmonitor.objects.all()
-    for health in healths:
-        pools = Pool.objects.filter(health_monitor_id=health.id)
-        if pools.count() == 0:
-            logger.error("Pool information does not exist (health_monitor_id=%s)" % health.id)
-            return "Error"
-
-    return "Success"
+    return violations
 
 
 class LoadbalancerSerializer(PlusModelSerializer):
@@ -153,10 +116,11 @@ class LoadbalancerSerializer(PlusModelSerializer):
 
         class Meta:
             model = Loadbalancer
-            fields = ('id', 'owner', 'name', 'listener', 'ptr_listener_id', 'pool', 'ptr_pool_id', 'slice_name', 'vip_address', 'description', 'admin_state_up')
+            fields = ('id', 'owner', 'name', 'listener', 'ptr_listener_id', 'pool', 'ptr_pool_id', 'slice_name', 'vip_address', 'description', 'admin_state_up',
+                      'max_connections', 'nbthread', 'cpu_set', 'tls_session_cache_size', 'tls_session_lifetime')
 
 
-class LoadbalancerViewSet(XOSViewSet):
+class LoadbalancerViewSet(MessageLogMixin, ListQueryMixin, TuningFieldsMixin, XOSViewSet):
     authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication)
 
     base_name = "loadbalancers"
@@ -165,33 +129,62 @@ class LoadbalancerViewSet(XOSViewSet):
     queryset = Loadbalancer.objects.all()
     serializer_class = LoadbalancerSerializer
 
+    list_id_field = "loadbalancer_id"
+    list_filter_fields = ("name", "slice_name", "vip_address", "provisioning_status", "operating_status")
+
+    # Process-wide settings of the loadbalancer's haproxy: global maxconn,
+    # the number of threads and the TLS session cache. nbthread 0 lets the
+    # model policy derive the thread count and cpu_set from the flavor.
+    tuning_int_fields = {"max_connections": (1, MAX_CONNECTIONS),
+                         "nbthread": (0, 64),
+                         "tls_session_cache_size": (0, 10000000),
+                         "tls_session_lifetime": (1, 86400)}
+
     @classmethod
     def get_urlpatterns(self, api_path="^"):
         patterns = super(LoadbalancerViewSet, self).get_urlpatterns(api_path=api_path)
 
+        # The bulk endpoint must come before the default detail route,
+        # which would otherwise match "statuses" as a loadbalancer_id.
+        patterns.insert(0, self.list_url("statuses/$", {"get": "get_loadbalancers_statuses"}, "loadbalancers_statuses"))
+
         # lb to demonstrate adding a custom endpoint
         patterns.append(self.detail_url("statuses/$", {"get": "get_loadbalancer_statuses"}, "loadbalancer_statuses"))
         patterns.append(self.detail_url("check/$", {"get": "get_loadbalancer_check"}, "loadbalancer_check"))
 
         return patterns
 
-    def print_message_log(self, msg_type, http):
-        if msg_type == "REQ":
-            logger.info("###################################################")
-            logger.info("[Server] <--- [Client]")
-            logger.info("METHOD=%s" % http.method)
-            logger.info("URI=%s" % http.path)
-            logger.info("%s\n" % http.data)
-        elif msg_type == "RSP":
-            logger.info("[Server] ---> [Client]")
-            logger.info("%s" % http)
-            logger.info("Send http rsponse Success..\n")
-        else:
-            logger.error("Invalid msg_type(%s)" % msg_type)
+    # Loads the listeners and pools of every loadbalancer in queryset along
+    # with it, so that get_frontends() does not issue any further queries.
+    def load_loadbalancers(self, queryset):
+        queryset = queryset.select_related('listener', 'pool')
+        return list(queryset.prefetch_related('loadbalancer_listeners__listener', 'loadbalancer_listeners__default_pool'))
+
+    # Returns the (listener, pool) pairs served by the loadbalancer: its own
+    # listener and pool first, then the additional LoadbalancerListeners.
+    def get_frontends(self, lb_info):
+        frontends = []
+        listener = lb_info.listener
+        if listener is not None and not listener.deleted:
+            pool = lb_info.pool
+            frontends.append((listener, pool if pool is not None and not pool.deleted else None))
+
+        for binding in lb_info.loadbalancer_listeners.all():
+            if binding.deleted or binding.listener.deleted:
+                continue
+            pool = binding.default_pool
+            frontends.append((binding.listener, pool if not pool.deleted else None))
+
+        return frontends
 
     def get_rsp_body(self, lb_id):
-        lb_info = Loadbalancer.objects.get(loadbalancer_id=lb_id)
+        lb_info = self.load_loadbalancers(Loadbalancer.objects.filter(loadbalancer_id=lb_id))[0]
 
+        return self.build_rsp_body(lb_info)
+
+    # lb_info must be loaded with load_loadbalancers(), so that building the
+    # body does not issue any further queries.
+    def build_rsp_body(self, lb_info):
         root_obj = {}
         lb_obj = {}
         listener_list = []
@@ -201,12 +194,19 @@ class LoadbalancerViewSet(XOSViewSet):
         lb_obj['description'] = lb_info.description
         lb_obj['admin_state_up'] = lb_info.admin_state_up
         lb_obj['provisioning_status'] = lb_info.provisioning_status
+        lb_obj['max_connections'] = lb_info.max_connections
+        lb_obj['nbthread'] = lb_info.nbthread
+        lb_obj['cpu_set'] = lb_info.cpu_set
+        lb_obj['tls_session_cache_size'] = lb_info.tls_session_cache_size
+        lb_obj['tls_session_lifetime'] = lb_info.tls_session_lifetime
+
+        frontends = self.get_frontends(lb_info)
 
         lb_obj['listeners'] = listener_list
-        listeners = Listener.objects.filter(id=lb_info.listener_id)
-        for listener in listeners:
+        for listener, pool in frontends:
             listener_obj = {}
             listener_obj['id'] = listener.listener_id
+            listener_obj['default_pool_id'] = pool.pool_id if pool is not None else None
             listener_list.append(listener_obj)
 
         lb_obj['vip_address'] = lb_info.vip_address
@@ -216,8 +216,9 @@ class LoadbalancerViewSet(XOSViewSet):
         lb_obj['loadbalancer_name'] = lb_info.name
 
         lb_obj['pools'] = pool_list
-        pools = Pool.objects.filter(id=lb_info.pool_id)
-        for pool in pools:
+        for listener, pool in frontends:
+            if pool is None or pool.pool_id in [pool_obj['id'] for pool_obj in pool_list]:
+                continue
             pool_obj = {}
             pool_obj['id'] = pool.pool_id
             pool_list.append(pool_obj)
@@ -226,7 +227,55 @@ class LoadbalancerViewSet(XOSViewSet):
 
         return root_obj, lb_obj
 
-    def update_loadbalancer_info(self, lb_info, request):
+    # Parses the optional "listeners" list of a create or update request:
+    #   [{"listener_id": ..., "default_pool_id": ...}, ...]
+    # The first entry becomes the loadbalancer's own listener and pool, the
+    # rest are attached as LoadbalancerListeners. All of them are served by
+    # the same haproxy process, so their ports must differ.
+    def get_request_frontends(self, request):
+        if 'listeners' not in request.data:
+            return None
+
+        items = request.data["listeners"]
+        if not isinstance(items, list) or len(items) == 0:
+            raise ValueError("listeners must be a non-empty list")
+
+        frontends = []
+        ports = set()
+        for item in items:
+            if not isinstance(item, dict) or not item.get("listener_id") or not item.get("default_pool_id"):
+                raise ValueError("each listener needs listener_id and default_pool_id")
+
+            listener = Listener.objects.filter(listener_id=item["listener_id"]).first()
+            if listener is None:
+                raise ValueError("listener_id(%s) does not exist in Listener table" % item["listener_id"])
+            pool = Pool.objects.filter(pool_id=item["default_pool_id"]).first()
+            if pool is None:
+                raise ValueError("pool_id(%s) does not exist in Pool table" % item["default_pool_id"])
+
+            if listener.protocol_port in ports:
+                raise ValueError("protocol_port(%s) is used by more than one listener" % listener.protocol_port)
+            ports.add(listener.protocol_port)
+
+            frontends.append((listener, pool))
+
+        return frontends
+
+    def save_listener_bindings(self, lb_info, frontends):
+        LoadbalancerListener.objects.filter(loadbalancer_id=lb_info.id).delete()
+
+        for listener, pool in frontends:
+            binding = LoadbalancerListener()
+            binding.loadbalancer_id = lb_info.id
+            binding.listener_id = listener.id
+            binding.default_pool_id = pool.id
+            binding.save()
+
+        # The loadbalancer was saved before its bindings existed; sync it
+        # again so the synchronizer renders them.
+        resync_queue.touch([lb_info.id])
+
+    def update_loadbalancer_info(self, lb_info, request, frontends=None):
         required_flag = True
         if request.method == "POST":
             if 'name' not in request.data or request.data["name"] == "":
@@ -266,6 +315,10 @@ class LoadbalancerViewSet(XOSViewSet):
             logger.error("JSON Key error: %s" % str(err))
             return None
 
+        if frontends is not None:
+            lb_info.ptr_listener_id = frontends[0][0].listener_id
+            lb_info.ptr_pool_id = frontends[0][1].pool_id
+
         if lb_info.ptr_listener_id is None or lb_info.ptr_listener_id == "":
             lb_info.listener_id = None
         else:
@@ -288,6 +341,9 @@ class LoadbalancerViewSet(XOSViewSet):
 
         lb_info.save(always_update_timestamp=True)
 
+        if frontends is not None:
+            self.save_listener_bindings(lb_info, frontends[1:])
+
         return lb_info
 
     def check_lb_id(self, lb_id):
@@ -300,24 +356,28 @@ class LoadbalancerViewSet(XOSViewSet):
 
     # GET: /api/tenant/loadbalancers
     def list(self, request):
-        self.print_message_log("REQ", request)
-        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            queryset = self.filter_list_queryset(request, self.filter_queryset(self.get_queryset()))
+            lbs = self.load_loadbalancers(queryset)
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
 
         root_obj = {}
         lb_obj_list = []
-        root_obj['loadbalancers'] = lb_obj_list
 
-        for lb in queryset:
-            temp_obj, lb_obj = self.get_rsp_body(lb.loadbalancer_id)
+        for lb in lbs:
+            temp_obj, lb_obj = self.build_rsp_body(lb)
             lb_obj_list.append(lb_obj)
 
-        self.print_message_log("RSP", root_obj)
+        root_obj['loadbalancers'] = self.project_list_fields(request, lb_obj_list)
+        next_marker = self.get_next_marker(request, lbs)
+        if next_marker:
+            root_obj['next_marker'] = next_marker
+
         return Response(root_obj)
 
     # POST: /api/tenant/loadbalancers
     def create(self, request):
-        self.print_message_log("REQ", request)
-
         lb_info = Loadbalancer()
         lb_info.creator_id = 1
 
@@ -377,52 +437,55 @@ class LoadbalancerViewSet(XOSViewSet):
                 logger.error("%s" % str(err))
                 return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
 
+        try:
+            frontends = self.get_request_frontends(request)
+            self.apply_tuning_fields(request, lb_info)
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
+
         lb_info.loadbalancer_id = str(uuid.uuid4())
         lb_info.operating_status = "ONLINE"
         lb_info.provisioning_status = "PENDING_CREATE"
 
-        lb_info = self.update_loadbalancer_info(lb_info, request)
+        lb_info = self.update_loadbalancer_info(lb_info, request, frontends)
         if lb_info is None:
             return Response("Error: Mandatory fields not exist!", status=status.HTTP_400_BAD_REQUEST)
 
         rsp_data, lb_obj = self.get_rsp_body(lb_info.loadbalancer_id)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_201_CREATED)
 
     # GET: /api/tenant/loadbalancers/{loadbalancer_id}
     def retrieve(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         if self.check_lb_id(pk) is None:
             return Response("Error: loadbalancer_id does not exist in Loadbalancer table", status=status.HTTP_404_NOT_FOUND)
 
         rsp_data, lb_obj = self.get_rsp_body(pk)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data)
 
     # PUT: /api/tenant/loadbalancers/{loadbalancer_id}
     def update(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         lb_info = self.check_lb_id(pk)
         if lb_info is None:
             return Response("Error: loadbalancer_id does not exist in Loadbalancer table", status=status.HTTP_404_NOT_FOUND)
 
-        lb_info = self.update_loadbalancer_info(lb_info, request)
+        try:
+            frontends = self.get_request_frontends(request)
+            self.apply_tuning_fields(request, lb_info)
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
+
+        lb_info = self.update_loadbalancer_info(lb_info, request, frontends)
         if lb_info is None:
             return Response("Error: Mandatory fields not exist!", status=status.HTTP_400_BAD_REQUEST)
 
         rsp_data, lb_obj = self.get_rsp_body(pk)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_202_ACCEPTED)
 
     # DELETE: /api/tenant/loadbalancers/{loadbalancer_id}
     def destroy(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         lb_info = self.check_lb_id(pk)
         if lb_info is None:
             return Response("Error: loadbalancer_id does not exist in Loadbalancer table", status=status.HTTP_404_NOT_FOUND)
@@ -431,54 +494,59 @@ class LoadbalancerViewSet(XOSViewSet):
         ins.deleted = True
         ins.save()
 
+        LoadbalancerListener.objects.filter(loadbalancer_id=lb_info.id).delete()
         Loadbalancer.objects.filter(loadbalancer_id=pk).delete()
         Port.objects.filter(instance_id=lb_info.instance_id).delete()
         Tag.objects.filter(object_id=lb_info.instance_id).delete()
 
-        self.print_message_log("RSP", "")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    # GET: /api/tenant/loadbalancers/{loadbalancer_id}/statuses
-    def get_loadbalancer_statuses(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
-        if self.check_lb_id(pk) is None:
-            return Response("Error: loadbalancer_id does not exist in Loadbalancer table", status=status.HTTP_404_NOT_FOUND)
-
-        root_obj = {}
-        status_obj = {}
-        lb_obj = {}
-        listener_list = []
-
-        root_obj['statuses'] = status_obj
-        status_obj['loadblancer'] = lb_obj
-
-        lb_info = Loadbalancer.objects.get(loadbalancer_id=pk)
-        lb_obj['name'] = lb_info.name
-        lb_obj['id'] = lb_info.loadbalancer_id
-        lb_obj['operating_status'] = lb_info.operating_status
-        lb_obj['provisioning_status'] = lb_info.provisioning_status
-
-        lb_obj['listeners'] = listener_list
-        listeners = Listener.objects.filter(id=lb_info.listener_id)
-        if listeners.count() == 0:
-            logger.error("listener_id does not exist in Listener table (listener_id=%s)" % lb_info.listener_id)
-
-        for listener in listeners:
-            listener_obj = {}
-            pool_list = []
-            listener_obj['name'] = listener.name
-            listener_obj['id'] = listener.listener_id
-            listener_obj['operating_status'] = "ONLINE"
-            listener_obj['provisioning_status'] = "ACTIVE"
-            listener_list.append(listener_obj)
-
-            listener_obj['pools'] = pool_list
-            pools = Pool.objects.filter(id=lb_info.pool_id)
-            if pools.count() == 0:
-                logger.error("pool_id does not exist in Pool table (pool_id=%s)" % lb_info.pool_id)
+    # lbs must be loaded with load_loadbalancers(). Members and health
+    # monitors of all their pools are then read with one query each.
+    def build_status_trees(self, lbs):
+        frontend_map = dict((lb.id, self.get_frontends(lb)) for lb in lbs)
+        pools = [pool for frontends in frontend_map.values() for listener, pool in frontends if pool is not None]
+
+        member_map = {}
+        for member in Member.objects.filter(memberpool_id__in=[pool.id for pool in pools]):
+            member_map.setdefault(member.memberpool_id, []).append(member)
+
+        health_map = {}
+        for health in Healthmonitor.objects.filter(id__in=set(pool.health_monitor_id for pool in pools)):
+            health_map[health.id] = health
+
+        status_list = []
+        for lb_info in lbs:
+            status_obj = {}
+            lb_obj = {}
+            listener_list = []
+            status_obj['loadblancer'] = lb_obj
+            status_list.append(status_obj)
+
+            lb_obj['name'] = lb_info.name
+            lb_obj['id'] = lb_info.loadbalancer_id
+            lb_obj['operating_status'] = lb_info.operating_status
+            lb_obj['provisioning_status'] = lb_info.provisioning_status
+
+            lb_obj['listeners'] = listener_list
+            frontends = frontend_map[lb_info.id]
+            if len(frontends) == 0:
+                logger.error("listener_id does not exist in Listener table (listener_id=%s)" % lb_info.listener_id)
+
+            for listener, pool in frontends:
+                listener_obj = {}
+                pool_list = []
+                listener_obj['name'] = listener.name
+                listener_obj['id'] = listener.listener_id
+                listener_obj['operating_status'] = "ONLINE"
+                listener_obj['provisioning_status'] = "ACTIVE"
+                listener_list.append(listener_obj)
+
+                listener_obj['pools'] = pool_list
+                if pool is None:
+                    logger.error("pool does not exist in Pool table (listener_id=%s)" % listener.listener_id)
+                    continue
 
-            for pool in pools:
                 pool_obj = {}
                 member_list = []
                 pool_obj['name'] = pool.name
@@ -489,17 +557,17 @@ class LoadbalancerViewSet(XOSViewSet):
 
                 health_obj = {}
                 pool_obj['health_monitor'] = health_obj
-                try:
-                    health = Healthmonitor.objects.get(id=pool.health_monitor_id)
+                health = health_map.get(pool.health_monitor_id)
+                if health is not None:
                     health_obj['type'] = health.type
                     health_obj['id'] = health.health_monitor_id
                     health_obj['provisioning_status'] = "ACTIVE"
-                except Exception as err:
-                    logger.error("%s (health_monitor_id=%s)" % (str(err), pool.health_monitor_id))
+                else:
+                    logger.error("Healthmonitor does not exist (health_monitor_id=%s)" % pool.health_monitor_id)
 
                 pool_obj['members'] = member_list
-                members = Member.objects.filter(memberpool_id=pool.id)
-                if members.count() == 0:
+                members = member_map.get(pool.id, [])
+                if len(members) == 0:
                     logger.error("memberpool_id does not exist in Member table (memberpool_id=%s)" % pool.id)
 
                 for member in members:
@@ -511,17 +579,45 @@ class LoadbalancerViewSet(XOSViewSet):
                     member_obj['provisioning_status'] = member.provisioning_status
                     member_list.append(member_obj)
 
-        self.print_message_log("RSP", root_obj)
+        return status_list
+
+    # GET: /api/tenant/loadbalancers/{loadbalancer_id}/statuses
+    def get_loadbalancer_statuses(self, request, pk=None):
+        lbs = self.load_loadbalancers(Loadbalancer.objects.filter(loadbalancer_id=pk))
+        if len(lbs) == 0:
+            logger.error("loadbalancer_id does not exist in Loadbalancer table (lb_id=%s)" % pk)
+            return Response("Error: loadbalancer_id does not exist in Loadbalancer table", status=status.HTTP_404_NOT_FOUND)
+
+        root_obj = {}
+        root_obj['statuses'] = self.build_status_trees(lbs)[0]
+
+        return Response(root_obj)
+
+    # GET: /api/tenant/loadbalancers/statuses?ids={loadbalancer_id},{loadbalancer_id},...
+    def get_loadbalancers_statuses(self, request):
+        ids = [lb_id.strip() for lb_id in request.query_params.get("ids", "").split(",") if lb_id.strip()]
+        if len(ids) == 0:
+            return Response("Error: ids parameter is required", status=status.HTTP_400_BAD_REQUEST)
+
+        lbs = self.load_loadbalancers(Loadbalancer.objects.filter(loadbalancer_id__in=ids))
+
+        root_obj = {}
+        root_obj['statuses'] = self.build_status_trees(lbs)
+
+        found = set(lb.loadbalancer_id for lb in lbs)
+        root_obj['not_found'] = [lb_id for lb_id in ids if lb_id not in found]
+
         return Response(root_obj)
 
     # GET: /api/tenant/loadbalancers/{loadbalancer_id}/check
     def get_loadbalancer_check(self, request, pk=None):
         res_obj = {}
         result1 = check_loadbalancer_model_info(pk)
-        result2 = check_loadbalancer_model_all_info()
+        violations = check_loadbalancer_model_all_info()
 
         lb_id = "loadbalancer_id(%s)" % pk
         res_obj[lb_id] = result1
-        res_obj['all_loadbalanacer'] = result2
+        res_obj['all_loadbalanacer'] = "Error" if violations else "Success"
+        res_obj['violations'] = violations
 
         return Response(res_obj)
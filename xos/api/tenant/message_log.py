@@ -0,0 +1,93 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from xos.logger import Logger, logging
+from django.conf import settings
+import json
+import os
+import random
+import time
+
+LEVELS = {"debug": logging.DEBUG,
+          "info": logging.INFO,
+          "warning": logging.WARNING,
+          "error": logging.ERROR}
+
+
+def get_setting(name, default):
+    # A Django setting of the same name wins over the environment.
+    value = getattr(settings, name, None)
+    if value is None:
+        value = os.environ.get(name)
+    return default if value is None or value == "" else value
+
+
+def get_sample_rate():
+    try:
+        rate = float(get_setting("LBAAS_API_LOG_SAMPLE_RATE", 1.0))
+    except ValueError:
+        return 1.0
+    return min(max(rate, 0.0), 1.0)
+
+
+# LBAAS_API_LOG_LEVEL=debug also logs request and response bodies;
+# LBAAS_API_LOG_SAMPLE_RATE (0.0 to 1.0) is the share of successful
+# requests that get a summary line.
+log_level = LEVELS.get(str(get_setting("LBAAS_API_LOG_LEVEL", "info")).lower(), logging.INFO)
+logger = Logger(level=log_level)
+LOG_SAMPLE_RATE = get_sample_rate()
+
+
+class MessageLogMixin(object):
+    """Logs one summary line per request (method, path, status, payload
+    sizes and latency) for the tenant viewsets. Request and response bodies
+    are only rendered when log_level is DEBUG, and successful requests can
+    be sampled with log_sample_rate."""
+
+    log_sample_rate = LOG_SAMPLE_RATE
+
+    def initial(self, request, *args, **kwargs):
+        self.request_start_time = time.time()
+        super(MessageLogMixin, self).initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super(MessageLogMixin, self).finalize_response(request, response, *args, **kwargs)
+
+        # Errors are always logged; successful requests may be sampled.
+        status_code = response.status_code
+        if status_code < 400 and self.log_sample_rate < 1.0 and random.random() >= self.log_sample_rate:
+            return response
+
+        start_time = getattr(self, "request_start_time", None)
+        latency = (time.time() - start_time) * 1000 if start_time else 0.0
+        req_size = request.META.get("CONTENT_LENGTH") or 0
+
+        if log_level <= logging.DEBUG:
+            logger.debug("[Server] <--- [Client] %s %s %s" % (request.method, request.path, request.data))
+            logger.debug("[Server] ---> [Client] %s" % json.dumps(response.data))
+
+        def log_summary(rendered):
+            log_func = logger.error if status_code >= 500 else logger.info
+            log_func("%s %s status=%s req_size=%s rsp_size=%d latency=%.1fms"
+                     % (request.method, request.path, status_code, req_size, len(rendered.content), latency))
+
+        # The body size is only known once the response has been rendered,
+        # which happens after the view returns.
+        if hasattr(response, "add_post_render_callback"):
+            response.add_post_render_callback(log_summary)
+        else:
+            log_summary(response)
+
+        return response
@@ -0,0 +1,64 @@
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+def find_model_violations(lbs, listeners, pools, members, healths, bindings):
+    """Returns the dangling references and orphans among the lbaas models.
+
+    Every argument holds the id and foreign-key columns of one table, as
+    check_loadbalancer_model_all_info loads them: lbs, pools, members and
+    bindings are lists of (loadbalancer_id, listener_id, pool_id),
+    (id, pool_id, health_monitor_id), (member_id, memberpool_id) and
+    (loadbalancer_id, listener_id, default_pool_id) tuples; listeners and
+    healths map id to listener_id and health_monitor_id."""
+
+    pool_ids = set(pool[0] for pool in pools)
+    used_listener_ids = set(lb[1] for lb in lbs) | set(binding[1] for binding in bindings)
+    used_pool_ids = set(lb[2] for lb in lbs) | set(binding[2] for binding in bindings)
+    used_health_ids = set(pool[2] for pool in pools)
+    member_pool_ids = set(member[1] for member in members)
+
+    violations = []
+
+    for lb_id, listener_id, pool_id in lbs:
+        if listener_id not in listeners:
+            violations.append("Listener information does not exist (loadbalancer_id=%s, id=%s)" % (lb_id, listener_id))
+        if pool_id not in pool_ids:
+            violations.append("Pool information does not exist (loadbalancer_id=%s, id=%s)" % (lb_id, pool_id))
+
+    for lb_id, listener_id, pool_id in bindings:
+        if listener_id not in listeners:
+            violations.append("Listener information does not exist (loadbalancer=%s, id=%s)" % (lb_id, listener_id))
+        if pool_id not in pool_ids:
+            violations.append("Pool information does not exist (loadbalancer=%s, id=%s)" % (lb_id, pool_id))
+
+    for listener_id in set(listeners) - used_listener_ids:
+        violations.append("Loadbalancer information does not exist (listener_id=%s)" % listeners[listener_id])
+
+    for id, pool_id, health_monitor_id in pools:
+        if id not in used_pool_ids:
+            violations.append("Loadbalancer information does not exist (pool_id=%s)" % pool_id)
+        if id not in member_pool_ids:
+            violations.append("Member information does not exist (pool_id=%s)" % pool_id)
+        if health_monitor_id not in healths:
+            violations.append("Health information does not exist (pool_id=%s, health_monitor_id=%s)" % (pool_id, health_monitor_id))
+
+    for member_id, memberpool_id in members:
+        if memberpool_id not in pool_ids:
+            violations.append("Pool information does not exist (member_id=%s, id=%s)" % (member_id, memberpool_id))
+
+    for health_id in set(healths) - used_health_ids:
+        violations.append("Pool information does not exist (health_monitor_id=%s)" % healths[health_id])
+
+    return violations
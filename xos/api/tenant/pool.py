@@ -27,22 +27,40 @@ from django.conf import settings
 from xos.apibase import XOSListCreateAPIView, XOSRetrieveUpdateDestroyAPIView, XOSPermissionDenied
 from api.xosapi_helpers import PlusModelSerializer, XOSViewSet, ReadOnlyField
 from xos.logger import Logger, logging
-from services.lbaas.models import LbService, Loadbalancer, Listener, Pool, Member, Healthmonitor
+from message_log import MessageLogMixin
+from list_query import ListQueryMixin
+from tuning_fields import TuningFieldsMixin, MAX_TIMEOUT, MAX_CONNECTIONS
+from lb_resync import resync_queue
+from services.lbaas.models import LbService, Loadbalancer, Listener, Pool, Member, Healthmonitor, LoadbalancerListener
 import json
 import uuid
 import traceback
 import time
 import threading
+from django.db import transaction
 
 logger = Logger(level=logging.INFO)
 settings.DEBUG = False
 
+# Range of a member weight, as haproxy accepts it; 0 drains the member.
+MAX_MEMBER_WEIGHT = 256
+
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
     def enforce_csrf(self, request):
         return  # To not perform the csrf check previously happening
 
 
+def parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ("true", "1"):
+        return True
+    if str(value).lower() in ("false", "0"):
+        return False
+    raise ValueError("not a boolean (%s)" % value)
+
+
 def get_default_lb_service():
     lb_services = LbService.objects.all()
     if lb_services:
@@ -51,41 +69,39 @@ def get_default_lb_service():
 
 
 def update_pool_status(pool_id):
-    pool_status = ""
-
-    pool = Pool.objects.get(pool_id=pool_id)
-    members = Member.objects.filter(memberpool=pool.id)
-    if members.count() > 0:
-        try:
-            pool = Pool.objects.get(pool_id=pool_id)
-        except Exception as err:
-            logger.error("%s (pool_id=%s)" % ((str(err), request.data["pool_id"])))
-            pool_status = "PENDING_CREATE"
+    try:
+        pool = Pool.objects.get(pool_id=pool_id)
+    except Exception as err:
+        logger.error("%s (pool_id=%s)" % (str(err), pool_id))
+        return None
 
-        healths = Healthmonitor.objects.filter(id=pool.health_monitor_id)
-        if healths.count() > 0:
-            pool_status = "ACTIVE"
-        else:
-            logger.error("Healthmonitor information does not exist (pool_id=%s)" % pool_id)
-            pool_status = "PENDING_CREATE"
-    else:
+    if not Member.objects.filter(memberpool=pool.id).exists():
         logger.error("Member information does not exist (pool_id=%s)" % pool.id)
         pool_status = "PENDING_CREATE"
+    elif not Healthmonitor.objects.filter(id=pool.health_monitor_id).exists():
+        logger.error("Healthmonitor information does not exist (pool_id=%s)" % pool_id)
+        pool_status = "PENDING_CREATE"
+    else:
+        pool_status = "ACTIVE"
 
-    pool = Pool.objects.get(pool_id=pool_id)
-    pool.status = pool_status
-    pool.save()
+    # The status is only recomputed when members or the health monitor
+    # change, and only written when it actually differs.
+    if pool.status != pool_status:
+        pool.status = pool_status
+        pool.save(update_fields=['status'])
 
     return pool.status
 
 
 def update_loadbalancer_model(pool_id):
-    lbs = Loadbalancer.objects.filter(ptr_pool_id=pool_id)
-    for lb in lbs:
-        lb.save(always_update_timestamp=True)
+    lb_ids = set(Loadbalancer.objects.filter(ptr_pool_id=pool_id).values_list('id', flat=True))
+    lb_ids.update(LoadbalancerListener.objects.filter(default_pool__pool_id=pool_id).values_list('loadbalancer_id', flat=True))
 
-    if lbs.count() == 0:
+    if len(lb_ids) == 0:
         logger.info("pool_id(%s) does not exist in Loadbalancer table" % pool_id)
+        return
+
+    resync_queue.touch(lb_ids)
 
 
 class PoolSerializer(PlusModelSerializer):
@@ -93,10 +109,11 @@ class PoolSerializer(PlusModelSerializer):
 
     class Meta:
         model = Pool
-        fields = ('id', 'ptr_health_monitor_id', 'name', 'health_monitor', 'lb_algorithm', 'protocol', 'description', 'admin_state_up')
+        fields = ('id', 'ptr_health_monitor_id', 'name', 'health_monitor', 'lb_algorithm', 'protocol', 'description', 'admin_state_up',
+                  'timeout_member_connect', 'timeout_member_data', 'member_connection_limit', 'member_queue_limit', 'http_reuse')
 
 
-class PoolViewSet(XOSViewSet):
+class PoolViewSet(MessageLogMixin, ListQueryMixin, TuningFieldsMixin, XOSViewSet):
     authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication)
 
     base_name = "pools"
@@ -105,31 +122,31 @@ class PoolViewSet(XOSViewSet):
     queryset = Pool.objects.all()
     serializer_class = PoolSerializer
 
+    list_id_field = "pool_id"
+    list_filter_fields = ("name", "protocol", "lb_algorithm", "status")
+
+    # The member limits are rendered as maxconn/maxqueue on every server of
+    # the backend; -1 means unlimited.
+    tuning_int_fields = {"timeout_member_connect": (1, MAX_TIMEOUT),
+                         "timeout_member_data": (1, MAX_TIMEOUT),
+                         "member_connection_limit": (-1, MAX_CONNECTIONS),
+                         "member_queue_limit": (-1, MAX_CONNECTIONS)}
+    tuning_choice_fields = {"http_reuse": ("NEVER", "SAFE", "AGGRESSIVE", "ALWAYS")}
+
     @classmethod
     def get_urlpatterns(self, api_path="^"):
         patterns = super(PoolViewSet, self).get_urlpatterns(api_path=api_path)
 
         return patterns
 
-    def print_message_log(self, msg_type, http):
-        if msg_type == "REQ":
-            logger.info("###################################################")
-            logger.info("[Server] <--- [Client]")
-            logger.info("METHOD=%s" % http.method)
-            logger.info("URI=%s" % http.path)
-            logger.info("%s\n" % http.data)
-        elif msg_type == "RSP":
-            logger.info("[Server] ---> [Client]")
-            logger.info("%s" % http)
-            logger.info("Send http rsponse Success..\n")
-        else:
-            logger.error("Invalid msg_type(%s)" % msg_type)
-
     def get_rsp_body(self, pool_id):
-        update_pool_status(pool_id)
-
         pool = Pool.objects.get(pool_id=pool_id)
+        member_ids = list(Member.objects.filter(memberpool=pool.id).values_list('member_id', flat=True))
+        healths = list(Healthmonitor.objects.filter(id=pool.health_monitor_id))
+
+        return self.build_rsp_body(pool, member_ids, healths)
 
+    def build_rsp_body(self, pool, member_ids, healths):
         root_obj = {}
         pool_obj = {}
         health_list = []
@@ -143,21 +160,23 @@ class PoolViewSet(XOSViewSet):
         pool_obj['description'] = pool.description
 
         pool_obj['members'] = member_list
-        members = Member.objects.filter(memberpool=pool.id)
-        for member in members:
-            member_list.append(member.member_id)
+        for member_id in member_ids:
+            member_list.append(member_id)
 
         pool_obj['pool_id'] = pool.pool_id
         pool_obj['name'] = pool.name
         pool_obj['admin_state_up'] = pool.admin_state_up
+        pool_obj['timeout_member_connect'] = pool.timeout_member_connect
+        pool_obj['timeout_member_data'] = pool.timeout_member_data
+        pool_obj['member_connection_limit'] = pool.member_connection_limit
+        pool_obj['member_queue_limit'] = pool.member_queue_limit
+        pool_obj['http_reuse'] = pool.http_reuse
 
         pool_obj['health_monitors'] = health_list
-        healths = Healthmonitor.objects.filter(id=pool.health_monitor_id)
         for health in healths:
             health_list.append(health.health_monitor_id)
 
         pool_obj['health_monitors_status'] = health_status_list
-        healths = Healthmonitor.objects.filter(id=pool.health_monitor_id)
         for health in healths:
             health_status_obj = {}
             health_status_obj['monitor_id'] = health.health_monitor_id
@@ -225,24 +244,42 @@ class PoolViewSet(XOSViewSet):
 
     # GET: /api/tenant/pools
     def list(self, request):
-        self.print_message_log("REQ", request)
-        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            pools = list(self.filter_list_queryset(request, self.filter_queryset(self.get_queryset())))
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
 
         root_obj = {}
         pool_list = []
-        root_obj['pools'] = pool_list
 
-        for pool in queryset:
-            temp_obj, pool_obj = self.get_rsp_body(pool.pool_id)
+        # Members and health monitors of every pool are loaded with one
+        # query each instead of per pool.
+
+        member_map = {}
+        members = Member.objects.filter(memberpool_id__in=[pool.id for pool in pools])
+        for memberpool_id, member_id in members.values_list('memberpool_id', 'member_id'):
+            member_map.setdefault(memberpool_id, []).append(member_id)
+
+        health_map = {}
+        healths = Healthmonitor.objects.filter(id__in=set(pool.health_monitor_id for pool in pools))
+        for health in healths:
+            health_map[health.id] = health
+
+        for pool in pools:
+            health = health_map.get(pool.health_monitor_id)
+            temp_obj, pool_obj = self.build_rsp_body(pool, member_map.get(pool.id, []),
+                                                     [health] if health else [])
             pool_list.append(pool_obj)
 
-        self.print_message_log("RSP", root_obj)
+        root_obj['pools'] = self.project_list_fields(request, pool_list)
+        next_marker = self.get_next_marker(request, pools)
+        if next_marker:
+            root_obj['next_marker'] = next_marker
+
         return Response(root_obj)
 
     # POST: /api/tenant/pools
     def create(self, request):
-        self.print_message_log("REQ", request)
-
         if 'ptr_health_monitor_id' in request.data and request.data["ptr_health_monitor_id"]:
             try:
                 health = Healthmonitor.objects.get(health_monitor_id=request.data["ptr_health_monitor_id"])
@@ -253,54 +290,55 @@ class PoolViewSet(XOSViewSet):
         pool = Pool()
         pool.pool_id = str(uuid.uuid4())
 
+        try:
+            self.apply_tuning_fields(request, pool)
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
+
         pool = self.update_pool_info(pool, request)
         if pool is None:
             return Response("Error: Mandatory fields not exist!", status=status.HTTP_400_BAD_REQUEST)
 
+        update_pool_status(pool.pool_id)
         rsp_data, pool_obj = self.get_rsp_body(pool.pool_id)
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pool.pool_id,))
-        lb_thr.start()
+        update_loadbalancer_model(pool.pool_id)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_201_CREATED)
 
     # GET: /api/tenant/pools/{pool_id}
     def retrieve(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         if self.check_pool_id(pk) is None:
             return Response("Error: pool_id does not exist in Pooltable", status=status.HTTP_404_NOT_FOUND)
 
         rsp_data, pool_obj = self.get_rsp_body(pk)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data)
 
     # PUT: /api/tenant/pools/{pool_id}
     def update(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         pool = self.check_pool_id(pk)
         if pool is None:
             return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
 
+        try:
+            self.apply_tuning_fields(request, pool)
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
+
         pool = self.update_pool_info(pool, request)
         if pool is None:
             return Response("Error: Mandatory fields not exist!", status=status.HTTP_400_BAD_REQUEST)
 
+        update_pool_status(pk)
         rsp_data, pool_obj = self.get_rsp_body(pk)
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pk,))
-        lb_thr.start()
+        update_loadbalancer_model(pk)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_202_ACCEPTED)
 
     # DELETE: /api/tenant/pools/{pool_id}
     def destroy(self, request, pk=None):
-        self.print_message_log("REQ", request)
-
         pool = self.check_pool_id(pk)
         if pool is None:
             return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
@@ -311,15 +349,16 @@ class PoolViewSet(XOSViewSet):
         except Exception as err:
             logger.error("%s" % str(err))
 
+        if LoadbalancerListener.objects.filter(default_pool_id=pool.id).exists():
+            return Response("Error: There is a loadbalancer that uses pool_id", status=status.HTTP_404_NOT_FOUND)
+
         members = Member.objects.filter(memberpool_id=pool.id)
         if members.count() > 0:
             return Response("Error: There is a member that uses pool_id", status=status.HTTP_404_NOT_FOUND)
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pk,))
-        lb_thr.start()
+        update_loadbalancer_model(pk)
         Pool.objects.filter(pool_id=pk).delete()
 
-        self.print_message_log("RSP", "")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -331,7 +370,7 @@ class MemberSerializer(PlusModelSerializer):
         fields = ('id', 'memberpool', 'ptr_pool_id', 'address', 'protocol_port', 'weight', 'admin_state_up')
 
 
-class MemberViewSet(XOSViewSet):
+class MemberViewSet(MessageLogMixin, ListQueryMixin, XOSViewSet):
     authentication_classes = (CsrfExemptSessionAuthentication, BasicAuthentication)
 
     base_name = "pools"
@@ -340,29 +379,24 @@ class MemberViewSet(XOSViewSet):
     queryset = Member.objects.all()
     serializer_class = MemberSerializer
 
+    list_id_field = "member_id"
+    list_filter_fields = ("address", "protocol_port", "operating_status", "provisioning_status")
+
     @classmethod
     def get_urlpatterns(self, api_path="^"):
         patterns = super(MemberViewSet, self).get_urlpatterns(api_path=api_path)
 
-        return patterns
+        # Must precede the default detail route, which would take "bulk" as a member_id.
+        patterns.insert(0, self.list_url("bulk/$", {"post": "bulk_create", "put": "bulk_update", "delete": "bulk_destroy"}, "members_bulk"))
 
-    def print_message_log(self, msg_type, http):
-        if msg_type == "REQ":
-            logger.info("###################################################")
-            logger.info("[Server] <--- [Client]")
-            logger.info("METHOD=%s" % http.method)
-            logger.info("URI=%s" % http.path)
-            logger.info("%s\n" % http.data)
-        elif msg_type == "RSP":
-            logger.info("[Server] ---> [Client]")
-            logger.info("%s" % http)
-            logger.info("Send http rsponse Success..\n")
-        else:
-            logger.error("Invalid msg_type(%s)" % msg_type)
+        return patterns
 
     def get_rsp_body(self, member_id):
         member = Member.objects.get(member_id=member_id)
 
+        return self.build_rsp_body(member)
+
+    def build_rsp_body(self, member):
         root_obj = {}
         member_obj = {}
         root_obj['member'] = member_obj
@@ -434,25 +468,31 @@ class MemberViewSet(XOSViewSet):
 
     # GET: /api/tenant/pools/{pool_id}/members
     def list(self, request, pool_id=None):
-        self.print_message_log("REQ", request)
-        pool = Pool.objects.get(pool_id=pool_id)
-        queryset = Member.objects.filter(memberpool=pool.id)
+        pool = self.check_pool_id(pool_id)
+        if pool is None:
+            return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            members = list(self.filter_list_queryset(request, Member.objects.filter(memberpool=pool.id)))
+        except ValueError as err:
+            return Response("Error: %s" % str(err), status=status.HTTP_400_BAD_REQUEST)
 
         root_obj = {}
         member_list = []
-        root_obj['members'] = member_list
 
-        for member in queryset:
-            temp_obj, member_obj = self.get_rsp_body(member.member_id)
+        for member in members:
+            temp_obj, member_obj = self.build_rsp_body(member)
             member_list.append(member_obj)
 
-        self.print_message_log("RSP", root_obj)
+        root_obj['members'] = self.project_list_fields(request, member_list)
+        next_marker = self.get_next_marker(request, members)
+        if next_marker:
+            root_obj['next_marker'] = next_marker
+
         return Response(root_obj)
 
     # POST: /api/tenant/pools/{pool_id}/members
     def create(self, request, pool_id=None):
-        self.print_message_log("REQ", request)
-
         # Check whether the pool_id exists in the Pool table
         try:
             pool = Pool.objects.get(pool_id=request.data["ptr_pool_id"])
@@ -472,16 +512,12 @@ class MemberViewSet(XOSViewSet):
         rsp_data, member_obj = self.get_rsp_body(member.member_id)
 
         update_pool_status(member.memberpool.pool_id)
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pool_id,))
-        lb_thr.start()
+        update_loadbalancer_model(pool_id)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_201_CREATED)
 
     # GET: /api/tenant/pools/{pool_id}/members/{member_id}
     def retrieve(self, request, pool_id=None, pk=None):
-        self.print_message_log("REQ", request)
-
         if self.check_pool_id(pool_id) is None:
             return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
 
@@ -490,13 +526,10 @@ class MemberViewSet(XOSViewSet):
 
         rsp_data, member_obj = self.get_rsp_body(pk)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data)
 
     # PUT: /api/tenant/pools/{pool_id}/members/{member_id}
     def update(self, request, pool_id=None, pk=None):
-        self.print_message_log("REQ", request)
-
         pool = self.check_pool_id(pool_id)
         if pool is None:
             return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
@@ -511,27 +544,164 @@ class MemberViewSet(XOSViewSet):
 
         rsp_data, member_obj = self.get_rsp_body(pk)
 
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pool_id,))
-        lb_thr.start()
+        update_pool_status(pool_id)
+        if member.ptr_pool_id != pool_id:
+            update_pool_status(member.ptr_pool_id)
+
+        update_loadbalancer_model(pool_id)
 
-        self.print_message_log("RSP", rsp_data)
         return Response(rsp_data, status=status.HTTP_202_ACCEPTED)
 
     # DELETE: /api/tenant/pools/{pool_id}/members/{member_id}
     def destroy(self, request, pool_id=None, pk=None):
-        self.print_message_log("REQ", request)
-
         if self.check_pool_id(pool_id) is None:
             return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
 
         if self.check_member_id(pk) is None:
             return Response("Error: member_id does not exist in Member table", status=status.HTTP_404_NOT_FOUND)
 
+        Member.objects.filter(member_id=pk).delete()
+
         update_pool_status(pool_id)
-        lb_thr = threading.Thread(target=update_loadbalancer_model, args=(pool_id,))
-        lb_thr.start()
+        update_loadbalancer_model(pool_id)
 
-        Member.objects.filter(member_id=pk).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def get_bulk_members(self, request, create):
+        members = request.data.get("members") if hasattr(request.data, "get") else None
+        if not isinstance(members, list) or len(members) == 0:
+            return None, "Error: members must be a non-empty list"
+
+        for index, data in enumerate(members):
+            if not isinstance(data, dict):
+                return None, "Error: members[%d] is not an object" % index
+            if not create and not data.get("member_id"):
+                return None, "Error: members[%d] has no member_id" % index
+            if create and (not data.get("address") or not data.get("protocol_port")):
+                return None, "Error: members[%d] Mandatory fields not exist!" % index
+            for field, minimum, maximum in (("protocol_port", 1, 65535), ("weight", 0, MAX_MEMBER_WEIGHT)):
+                if field in data and data[field] != "":
+                    try:
+                        value = int(data[field])
+                    except (TypeError, ValueError):
+                        return None, "Error: members[%d] %s must be an integer" % (index, field)
+                    if value < minimum or value > maximum:
+                        return None, "Error: members[%d] %s must be between %d and %d" % (index, field, minimum, maximum)
+            if 'admin_state_up' in data and data["admin_state_up"] != "":
+                try:
+                    parse_bool(data["admin_state_up"])
+                except ValueError:
+                    return None, "Error: members[%d] admin_state_up must be a boolean" % index
+
+        return members, None
+
+    # Values were checked by get_bulk_members. Falsy ones are applied too:
+    # weight 0 and admin_state_up false are how members are drained and
+    # disabled.
+    def set_member_fields(self, member, data):
+        if 'address' in data and data["address"]:
+            member.address = data["address"]
+        if 'protocol_port' in data and data["protocol_port"] != "":
+            member.protocol_port = int(data["protocol_port"])
+        if 'weight' in data and data["weight"] != "":
+            member.weight = int(data["weight"])
+        if 'admin_state_up' in data and data["admin_state_up"] != "":
+            member.admin_state_up = parse_bool(data["admin_state_up"])
+
+    def finish_bulk_change(self, pool_id):
+        # Pool status and the LB resync are done once for the whole batch.
+        update_pool_status(pool_id)
+        update_loadbalancer_model(pool_id)
+
+    # POST: /api/tenant/pools/{pool_id}/members/bulk
+    def bulk_create(self, request, pool_id=None):
+        pool = self.check_pool_id(pool_id)
+        if pool is None:
+            return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
+
+        items, err = self.get_bulk_members(request, True)
+        if items is None:
+            return Response(err, status=status.HTTP_400_BAD_REQUEST)
+
+        members = []
+        for data in items:
+            member = Member()
+            member.member_id = str(uuid.uuid4())
+            member.operating_status = "ONLINE"
+            member.provisioning_status = "ACTIVE"
+            member.ptr_pool_id = pool.pool_id
+            member.memberpool_id = pool.id
+            self.set_member_fields(member, data)
+            members.append(member)
+
+        # Each member goes through save(), as in create, so that `updated` and
+        # the other XOS bookkeeping are set and the synchronizer sees the new
+        # rows; the single transaction keeps the batch all-or-nothing.
+        with transaction.atomic():
+            for member in members:
+                member.save()
+
+        self.finish_bulk_change(pool_id)
+
+        root_obj = {}
+        root_obj['members'] = [self.build_rsp_body(member)[1] for member in members]
+
+        return Response(root_obj, status=status.HTTP_201_CREATED)
+
+    # PUT: /api/tenant/pools/{pool_id}/members/bulk
+    def bulk_update(self, request, pool_id=None):
+        pool = self.check_pool_id(pool_id)
+        if pool is None:
+            return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
+
+        items, err = self.get_bulk_members(request, False)
+        if items is None:
+            return Response(err, status=status.HTTP_400_BAD_REQUEST)
+
+        member_map = {}
+        for member in Member.objects.filter(memberpool=pool.id, member_id__in=[data["member_id"] for data in items]):
+            member_map[member.member_id] = member
+
+        missing = [data["member_id"] for data in items if data["member_id"] not in member_map]
+        if missing:
+            return Response("Error: member_id does not exist in pool (%s)" % ", ".join(missing), status=status.HTTP_404_NOT_FOUND)
+
+        # Django has no bulk update of differing values, so the rows are
+        # saved one by one, but within a single transaction.
+        with transaction.atomic():
+            for data in items:
+                member = member_map[data["member_id"]]
+                self.set_member_fields(member, data)
+                member.save(update_fields=['address', 'protocol_port', 'weight', 'admin_state_up', 'updated'])
+
+        self.finish_bulk_change(pool_id)
+
+        root_obj = {}
+        root_obj['members'] = [self.build_rsp_body(member_map[data["member_id"]])[1] for data in items]
+
+        return Response(root_obj, status=status.HTTP_202_ACCEPTED)
+
+    # DELETE: /api/tenant/pools/{pool_id}/members/bulk
+    def bulk_destroy(self, request, pool_id=None):
+        pool = self.check_pool_id(pool_id)
+        if pool is None:
+            return Response("Error: pool_id does not exist in Pool table", status=status.HTTP_404_NOT_FOUND)
+
+        items, err = self.get_bulk_members(request, False)
+        if items is None:
+            return Response(err, status=status.HTTP_400_BAD_REQUEST)
+
+        member_ids = [data["member_id"] for data in items]
+        members = Member.objects.filter(memberpool=pool.id, member_id__in=member_ids)
+
+        found = set(members.values_list('member_id', flat=True))
+        missing = [member_id for member_id in member_ids if member_id not in found]
+        if missing:
+            return Response("Error: member_id does not exist in pool (%s)" % ", ".join(missing), status=status.HTTP_404_NOT_FOUND)
+
+        with transaction.atomic():
+            members.delete()
+
+        self.finish_bulk_change(pool_id)
 
-        self.print_message_log("RSP", "")
         return Response(status=status.HTTP_204_NO_CONTENT)
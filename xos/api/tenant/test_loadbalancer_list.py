@@ -0,0 +1,82 @@
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Query count of GET /api/tenant/loadbalancers. It needs the XOS core
+# Django environment with the lbaas models, so it is not part of rest_tenant
+# and runs from the service checkout in the xos core container:
+#
+#   python manage.py test /opt/xos_services/lbaas/xos/api/tenant
+
+import os
+import sys
+import uuid
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+from core.models import User
+from services.lbaas.models import LbService, Loadbalancer, Listener, Pool, Healthmonitor, LoadbalancerListener
+import loadbalancer
+
+
+class TestLoadbalancerListQueries(TestCase):
+    def setUp(self):
+        self.service = LbService.objects.create(name="lbaas", service_name="lbaas")
+        self.user = User(email="lbaas-test@example.com", is_admin=True)
+        self.view = loadbalancer.LoadbalancerViewSet.as_view({"get": "list"})
+        self.factory = APIRequestFactory()
+        self.port = 8000
+
+    def make_listener(self):
+        self.port += 1
+        return Listener.objects.create(name="listener%d" % self.port, listener_id=str(uuid.uuid4()),
+                                       protocol="HTTP", protocol_port=self.port)
+
+    def make_pool(self):
+        health = Healthmonitor.objects.create(name="health", health_monitor_id=str(uuid.uuid4()),
+                                              type="HTTP", delay=5, max_retries=3, timeout=3)
+        return Pool.objects.create(name="pool", pool_id=str(uuid.uuid4()), health_monitor=health)
+
+    def make_loadbalancers(self, count):
+        # Every loadbalancer has its own listener and pool plus one bound
+        # listener, so each page exercises the binding prefetch.
+        for i in range(count):
+            lb = Loadbalancer.objects.create(owner=self.service, loadbalancer_id=str(uuid.uuid4()),
+                                             name="lb", slice_name="lbaas_net", vip_address="10.0.0.%d" % (i + 1),
+                                             listener=self.make_listener(), pool=self.make_pool())
+            LoadbalancerListener.objects.create(loadbalancer=lb, listener=self.make_listener(),
+                                                default_pool=self.make_pool())
+
+    def count_list_queries(self, expected):
+        request = self.factory.get("/api/tenant/loadbalancers/")
+        force_authenticate(request, user=self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.view(request)
+            response.render()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["loadbalancers"]), expected)
+        for lb_obj in response.data["loadbalancers"]:
+            self.assertEqual(len(lb_obj["listeners"]), 2)
+        return len(queries.captured_queries)
+
+    def test_query_count_does_not_grow(self):
+        self.make_loadbalancers(2)
+        small = self.count_list_queries(2)
+
+        self.make_loadbalancers(8)
+        self.assertEqual(self.count_list_queries(10), small)
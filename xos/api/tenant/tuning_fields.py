@@ -0,0 +1,60 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Upper bound for the millisecond timeouts, one day.
+MAX_TIMEOUT = 86400000
+
+# Upper bound for every connection and queue limit.
+MAX_CONNECTIONS = 1000000
+
+
+class TuningFieldsMixin(object):
+    """Validation of the haproxy tuning fields a viewset accepts.
+
+    tuning_int_fields maps a field name to its (minimum, maximum) and
+    tuning_choice_fields maps a field name to its allowed values. Fields
+    that are absent from the request are left alone, so an update only
+    touches what was sent."""
+
+    tuning_int_fields = {}
+    tuning_choice_fields = {}
+
+    # Raises ValueError, before setting anything, if any field is invalid.
+    def apply_tuning_fields(self, request, obj):
+        fields = {}
+
+        for name, (minimum, maximum) in self.tuning_int_fields.items():
+            value = request.data.get(name)
+            if value is None or value == "":
+                continue
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                raise ValueError("%s must be an integer" % name)
+            if value < minimum or value > maximum:
+                raise ValueError("%s must be between %d and %d" % (name, minimum, maximum))
+            fields[name] = value
+
+        for name, choices in self.tuning_choice_fields.items():
+            value = request.data.get(name)
+            if value is None or value == "":
+                continue
+            value = str(value).upper()
+            if value not in choices:
+                raise ValueError("%s must be one of %s" % (name, ", ".join(choices)))
+            fields[name] = value
+
+        for name, value in fields.items():
+            setattr(obj, name, value)
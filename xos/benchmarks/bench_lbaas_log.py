@@ -0,0 +1,83 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Per-call cost of lbaas_log, against the inspect.stack() implementation it
+# replaced. Messages go to a logger without handlers, so only the caller
+# lookup and formatting are measured, from a stack as deep as --depth.
+#
+#   python benchmarks/bench_lbaas_log.py [--depth 30] [--calls 2000]
+
+import argparse
+import inspect
+import logging
+import os
+import sys
+import timeit
+
+from os.path import basename
+
+import benchutil
+
+benchutil.add_path("synchronizer")
+benchutil.require_xos_logger()
+import lbaas_log
+
+quiet = logging.getLogger("bench_lbaas_log")
+quiet.propagate = False
+quiet.addHandler(logging.NullHandler())
+quiet.setLevel(logging.DEBUG)
+lbaas_log.logger = quiet
+
+
+def old_info(msg):
+    quiet.info(basename(str(inspect.stack()[1][1])) + ':' +
+               str(inspect.stack()[1][2]) + ' ' +
+               str(inspect.stack()[1][3]) + '()  ' +
+               str(msg))
+
+
+def at_depth(depth, func):
+    if depth > 0:
+        return at_depth(depth - 1, func)
+    return func()
+
+
+def measure(func, depth, calls):
+    def run():
+        for i in range(calls):
+            func("lb.provisioning_status=ACTIVE")
+
+    seconds = min(timeit.repeat(lambda: at_depth(depth, run), number=1, repeat=5))
+    return seconds / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--depth", type=int, default=30, help="stack frames below the logging call")
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    lbaas_log.set_level(logging.INFO)
+    results = [("inspect.stack() x3, info", measure(old_info, args.depth, args.calls)),
+               ("sys._getframe(), info", measure(lbaas_log.info, args.depth, args.calls)),
+               ("sys._getframe(), debug disabled", measure(lbaas_log.debug, args.depth, args.calls))]
+
+    print("stack depth %d, %d calls" % (args.depth, args.calls))
+    for name, usec in results:
+        print("%-34s %10.2f us/call" % (name, usec))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Cost of check_loadbalancer_model_all_info on an in-memory SQLite copy of
+# the lbaas tables: the column loads plus find_model_violations, against
+# the per-row existence queries they replaced. SQLite in the same process
+# has no network round trip, so the old figures are a lower bound of what
+# it costs against the XOS database.
+#
+#   python benchmarks/bench_model_integrity.py [--members 4] [--max-old 100000]
+
+import argparse
+import sqlite3
+import time
+
+import benchutil
+
+benchutil.add_path("api", "tenant")
+import model_integrity
+
+SIZES = (1000, 10000, 100000)
+
+SCHEMA = """
+create table lb (id integer primary key, loadbalancer_id text, listener_id integer, pool_id integer);
+create table listener (id integer primary key, listener_id text);
+create table pool (id integer primary key, pool_id text, health_monitor_id integer);
+create table member (id integer primary key, member_id text, memberpool_id integer);
+create table health (id integer primary key, health_monitor_id text);
+create table binding (id integer primary key, loadbalancer_id integer, listener_id integer, default_pool_id integer);
+create index lb_listener on lb (listener_id);
+create index lb_pool on lb (pool_id);
+create index pool_health on pool (health_monitor_id);
+create index member_pool on member (memberpool_id);
+"""
+
+
+def make_db(lb_count, members_per_pool):
+    # Every loadbalancer has its own listener, pool, health monitor and
+    # listener binding, and the pool has members_per_pool members; Django
+    # indexes the foreign-key columns the old queries filter on.
+    db = sqlite3.connect(":memory:")
+    db.executescript(SCHEMA)
+    ids = range(1, lb_count + 1)
+    db.executemany("insert into lb values (?, ?, ?, ?)", ((i, "lb-%d" % i, i, i) for i in ids))
+    db.executemany("insert into listener values (?, ?)", ((i, "listener-%d" % i) for i in ids))
+    db.executemany("insert into pool values (?, ?, ?)", ((i, "pool-%d" % i, i) for i in ids))
+    db.executemany("insert into health values (?, ?)", ((i, "health-%d" % i) for i in ids))
+    db.executemany("insert into binding values (?, ?, ?, ?)", ((i, i, i, i) for i in ids))
+    db.executemany("insert into member (member_id, memberpool_id) values (?, ?)",
+                   (("member-%d-%d" % (i, j), i) for i in ids for j in range(members_per_pool)))
+    return db
+
+
+class Counter(object):
+    def __init__(self, db):
+        self.db = db
+        self.queries = 0
+
+    def all(self, sql, *args):
+        self.queries += 1
+        return self.db.execute(sql, args).fetchall()
+
+    def exists(self, sql, *args):
+        return len(self.all(sql, *args)) > 0
+
+
+def old_check(db):
+    # The removed implementation: one or two queries per row of every table.
+    q = Counter(db)
+    for id, listener_id, pool_id in q.all("select id, listener_id, pool_id from lb"):
+        if not q.exists("select id from listener where id = ?", listener_id):
+            return "Error", q.queries
+        if not q.exists("select id from pool where id = ?", pool_id):
+            return "Error", q.queries
+    for (id,) in q.all("select id from listener"):
+        if not q.exists("select id from lb where listener_id = ?", id):
+            return "Error", q.queries
+    for id, health_monitor_id in q.all("select id, health_monitor_id from pool"):
+        if not q.exists("select id from lb where pool_id = ?", id):
+            return "Error", q.queries
+        if not q.exists("select id from member where memberpool_id = ?", id):
+            return "Error", q.queries
+        if not q.exists("select id from health where id = ?", health_monitor_id):
+            return "Error", q.queries
+    for id, memberpool_id in q.all("select id, memberpool_id from member"):
+        if not q.exists("select id from pool where id = ?", memberpool_id):
+            return "Error", q.queries
+    for (id,) in q.all("select id from health"):
+        if not q.exists("select id from pool where health_monitor_id = ?", id):
+            return "Error", q.queries
+    return "Success", q.queries
+
+
+def new_check(db):
+    q = Counter(db)
+    lbs = q.all("select loadbalancer_id, listener_id, pool_id from lb")
+    listeners = dict(q.all("select id, listener_id from listener"))
+    pools = q.all("select id, pool_id, health_monitor_id from pool")
+    members = q.all("select member_id, memberpool_id from member")
+    healths = dict(q.all("select id, health_monitor_id from health"))
+    bindings = q.all("select loadbalancer_id, listener_id, default_pool_id from binding")
+    violations = model_integrity.find_model_violations(lbs, listeners, pools, members, healths, bindings)
+    return "Error" if violations else "Success", q.queries
+
+
+def measure(func, db):
+    start = time.time()
+    result, queries = func(db)
+    assert result == "Success"
+    return (time.time() - start) * 1000, queries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=4, help="members per pool")
+    parser.add_argument("--max-old", type=int, default=100000,
+                        help="largest loadbalancer count the old check is run for")
+    args = parser.parse_args()
+
+    rows = []
+    for lb_count in SIZES:
+        db = make_db(lb_count, args.members)
+        objects = lb_count * (5 + args.members)
+
+        old_ms, old_queries = "skipped", "-"
+        if lb_count <= args.max_old:
+            elapsed, old_queries = measure(old_check, db)
+            old_ms = "%.0f" % elapsed
+        new_ms, new_queries = min(measure(new_check, db) for i in range(3))
+        rows.append((lb_count, objects, old_queries, old_ms, new_queries, "%.0f" % new_ms))
+
+    benchutil.print_table(("lbs", "rows", "old queries", "old ms", "new queries", "new ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Time to write one loadbalancer's haproxy.cfg in the direct render mode
+# (haproxy_config.write_config) against an ansible-playbook run of the
+# copy_haproxy_config role, both into a temporary directory. The playbook
+# runs against localhost, so the SSH connection of a real sync is not
+# included. Needs jinja2; the playbook column is skipped when
+# ansible-playbook is not on the PATH.
+#
+#   python benchmarks/bench_render.py [--runs 3]
+
+import argparse
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+import benchutil
+
+benchutil.add_path("synchronizer")
+import haproxy_config
+
+STEPS_DIR = os.path.join(benchutil.XOS_DIR, "synchronizer", "steps")
+MEMBER_COUNTS = (10, 100, 1000)
+INSTANCE_ID = 1
+
+
+def make_context(member_count):
+    members = [{'member_id': "member-%d" % i,
+                'address': "10.%d.%d.%d" % (i >> 16 & 255, i >> 8 & 255, i & 255),
+                'protocol_port': 8080,
+                'weight': 1,
+                'admin_state_up': True} for i in range(member_count)]
+    health_monitor = {'health_monitor_id': "health-1", 'type': "HTTP", 'delay': 5, 'max_retries': 3,
+                      'timeout': 3000, 'http_method': "GET", 'url_path': "/", 'expected_codes': "200"}
+    return {'loadbalancer': {'loadbalancer_id': "lb-1", 'lb_name': "lb1", 'vip_address': "10.0.0.100",
+                             'runtime_port': 9999, 'runtime_sources': "", 'stats_api_port': 9998,
+                             'stats_api_sources': "", 'max_connections': 2000, 'nbthread': 2, 'cpu_set': "0-1",
+                             'tls_session_cache_size': 20000, 'tls_session_lifetime': 300, 'stat_port': 8404},
+            'listeners': [{'listener_name': "listener1", 'listener_id': "listener-1", 'protocol': "HTTP",
+                           'protocol_port': 80, 'connection_limit': -1, 'timeout_client_data': 50000,
+                           'keepalive_mode': "KEEP_ALIVE", 'default_tls_container_ref': "", 'certificate_hash': None,
+                           'cache_size_mb': 0, 'cache_max_age': 60, 'cache_max_object_size': 0,
+                           'compression_types': "", 'default_pool_id': "pool-1"}],
+            'pools': [{'pool_name': "pool1", 'pool_id': "pool-1", 'health_monitor_id': "health-1",
+                       'lb_algorithm': "ROUND_ROBIN", 'protocol': "HTTP", 'timeout_member_connect': 5000,
+                       'timeout_member_data': 50000, 'member_connection_limit': -1, 'member_queue_limit': -1,
+                       'http_reuse': "SAFE", 'members': members, 'health_monitor': health_monitor}]}
+
+
+def make_fields(context):
+    fields = haproxy_config.serialize_context(context)
+    fields.update(instance_id=INSTANCE_ID, update_time="2017-01-01 00:00:00", config_hash="bench",
+                  runtime_base_hash="", cert_dir=haproxy_config.CERT_DIR, config_check_timeout=5)
+    return fields
+
+
+def render_direct(context, volume_dir):
+    haproxy_config.INSTANCE_VOLUME_DIR = volume_dir
+    context = dict(context, update_time="2017-01-01 00:00:00", config_hash="bench", runtime_base_hash="")
+    haproxy_config.write_certificates(INSTANCE_ID, [])
+    return haproxy_config.write_config(INSTANCE_ID, context)
+
+
+def make_playbook(fields, work_dir, volume_dir):
+    # The synchronizer renders loadbalancer_playbook.yaml with the fields;
+    # here it then targets localhost, and the role writes into volume_dir.
+    with open(os.path.join(STEPS_DIR, "loadbalancer_playbook.yaml")) as f:
+        source = f.read()
+    playbook = haproxy_config.jinja2.Template(source).render(**fields)
+    playbook = playbook.replace('- hosts: ""\n  become: yes', "- hosts: localhost\n  connection: local")
+    # Current ansible-core only accepts play vars as a mapping.
+    playbook = re.sub(r"(?m)^    - (\w+): ", r"    \1: ", playbook)
+
+    role_dir = os.path.join(work_dir, "roles")
+    shutil.copytree(os.path.join(STEPS_DIR, "roles"), role_dir)
+    tasks = os.path.join(role_dir, "copy_haproxy_config", "tasks", "main.yml")
+    with open(tasks) as f:
+        source = f.read()
+    with open(tasks, "w") as f:
+        f.write(source.replace("/opt/xos/instance_volume", volume_dir))
+
+    path = os.path.join(work_dir, "playbook.yaml")
+    with open(path, "w") as f:
+        f.write(playbook)
+    return path
+
+
+def run_playbook(path):
+    # The role's `when: item.default_tls_container_ref` tests a string,
+    # which current ansible-core rejects unless told otherwise.
+    env = dict(os.environ, ANSIBLE_ALLOW_BROKEN_CONDITIONALS="True")
+    with open(os.devnull) as devnull:
+        process = subprocess.Popen(["ansible-playbook", "-i", "localhost,", path], cwd=os.path.dirname(path),
+                                   env=env, stdin=devnull, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    output = process.communicate()[0]
+    if process.returncode:
+        raise RuntimeError("ansible-playbook failed:\n%s" % output.decode("utf-8"))
+
+
+def measure(func, runs):
+    times = []
+    for i in range(runs):
+        start = time.time()
+        func()
+        times.append((time.time() - start) * 1000)
+    return min(times)
+
+
+def has_ansible():
+    try:
+        with open(os.devnull, "w") as devnull:
+            subprocess.check_call(["ansible-playbook", "--version"], stdout=devnull, stderr=devnull)
+        return True
+    except (OSError, subprocess.CalledProcessError):
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    ansible = has_ansible()
+    rows = []
+    for member_count in MEMBER_COUNTS:
+        context = make_context(member_count)
+        fields = make_fields(context)
+        work_dir = tempfile.mkdtemp(prefix="bench_render.")
+        try:
+            direct_dir = os.path.join(work_dir, "direct")
+            direct_ms = measure(lambda: render_direct(context, direct_dir), args.runs)
+
+            playbook_ms = "skipped"
+            if ansible:
+                playbook_dir = os.path.join(work_dir, "playbook")
+                path = make_playbook(fields, work_dir, playbook_dir)
+
+                # Stands in for the container's report that haproxy accepted
+                # the config, which the role waits for.
+                os.makedirs(os.path.join(playbook_dir, str(INSTANCE_ID)))
+                with open(os.path.join(playbook_dir, str(INSTANCE_ID), "haproxy.cfg.status"), "w") as f:
+                    f.write("bench applied\n")
+                playbook_ms = "%.0f" % measure(lambda: run_playbook(path), args.runs)
+
+                with open(os.path.join(direct_dir, str(INSTANCE_ID), "haproxy.cfg")) as f:
+                    direct = f.read()
+                with open(os.path.join(playbook_dir, str(INSTANCE_ID), "haproxy.cfg")) as f:
+                    assert f.read().strip() == direct.strip(), "playbook and direct render differ"
+        finally:
+            shutil.rmtree(work_dir)
+
+        rows.append((member_count, "%.1f" % direct_ms, playbook_ms))
+
+    if not ansible:
+        print("ansible-playbook not found, playbook runs skipped")
+    benchutil.print_table(("members", "direct ms", "playbook ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
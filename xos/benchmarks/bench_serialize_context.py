@@ -0,0 +1,112 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Cost of turning the sync template context into playbook fields:
+# haproxy_config.serialize_context against the removed path, which dumped
+# every sub-object with indent=4 twice (fields and log message) and then
+# walked the fields with convert_unicode_to_str. Needs jinja2, which
+# haproxy_config imports.
+#
+#   python benchmarks/bench_serialize_context.py [--pools 4]
+
+import argparse
+import json
+import logging
+import timeit
+
+import benchutil
+
+benchutil.add_path("synchronizer")
+import haproxy_config
+
+try:
+    basestring
+except NameError:
+    basestring = str
+
+MEMBER_COUNTS = (10, 100, 1000, 5000)
+
+quiet = logging.getLogger("bench_serialize_context")
+quiet.propagate = False
+quiet.addHandler(logging.NullHandler())
+quiet.setLevel(logging.INFO)
+
+
+def make_context(pool_count, member_count):
+    members = [{'member_id': "member-%d" % i,
+                'address': "10.%d.%d.%d" % (i >> 16 & 255, i >> 8 & 255, i & 255),
+                'protocol_port': 8080,
+                'weight': 1,
+                'admin_state_up': True} for i in range(member_count)]
+    health_monitor = {'health_monitor_id': "health-1", 'type': "HTTP", 'delay': 5, 'max_retries': 3,
+                      'timeout': 3, 'http_method': "GET", 'url_path': "/", 'expected_codes': "200"}
+    pools = [{'pool_name': "pool%d" % i, 'pool_id': "pool-%d" % i, 'health_monitor_id': "health-1",
+              'lb_algorithm': "ROUND_ROBIN", 'protocol': "HTTP", 'timeout_member_connect': 5,
+              'timeout_member_data': 50, 'member_connection_limit': -1, 'member_queue_limit': -1,
+              'http_reuse': "safe", 'members': members, 'health_monitor': health_monitor}
+             for i in range(pool_count)]
+    listeners = [{'listener_name': "listener%d" % i, 'listener_id': "listener-%d" % i, 'protocol': "HTTP",
+                  'protocol_port': 80 + i, 'connection_limit': -1, 'default_pool_id': "pool-%d" % i}
+                 for i in range(pool_count)]
+    return {'loadbalancer': {'loadbalancer_id': "lb-1", 'lb_name': "lb1", 'vip_address': "10.0.0.100"},
+            'listeners': listeners,
+            'pools': pools}
+
+
+def convert_unicode_to_str(data):
+    # The removed SyncLoadbalancer method, with dict and list standing in
+    # for the collections ABCs.
+    if isinstance(data, basestring):
+        return str(data)
+    elif isinstance(data, dict):
+        return dict(map(convert_unicode_to_str, data.items()))
+    elif isinstance(data, (list, tuple)):
+        return type(data)(map(convert_unicode_to_str, data))
+    else:
+        return data
+
+
+def old_serialize(context):
+    fields = {}
+    for name, value in context.items():
+        fields[name] = json.dumps(value, indent=4)
+        quiet.info(">>>>> %s" % name)
+        quiet.info("%s" % json.dumps(value, indent=4))
+    return convert_unicode_to_str(fields)
+
+
+def measure(func, context):
+    return min(timeit.repeat(lambda: func(context), number=5, repeat=3)) / 5 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pools", type=int, default=4, help="pools (and listeners) in the context")
+    args = parser.parse_args()
+
+    rows = []
+    for member_count in MEMBER_COUNTS:
+        context = make_context(args.pools, member_count)
+        old_size = sum(len(value) for value in old_serialize(context).values())
+        new_size = sum(len(value) for value in haproxy_config.serialize_context(context).values())
+        rows.append((member_count, "%.2f" % measure(old_serialize, context), old_size,
+                     "%.2f" % measure(haproxy_config.serialize_context, context), new_size))
+
+    print("%d pools" % args.pools)
+    benchutil.print_table(("members/pool", "old ms", "old bytes", "new ms", "new bytes"), rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Cost of one check_lb_vip_address pass over in-memory rows: the port index
+# and mismatch scan in sync_config.py against the nested LB x port loop they
+# replaced. Database time is not included.
+#
+#   python benchmarks/bench_vip_reconcile.py [--max-nested 50000000]
+
+import argparse
+import timeit
+
+import benchutil
+
+benchutil.add_path("synchronizer")
+benchutil.require_synchronizer_modules()
+import sync_config
+
+SIZES = ((100, 1000), (1000, 5000), (5000, 20000), (20000, 100000))
+
+
+class Row(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def make_rows(lb_count, port_count):
+    # Every LB has its own instance and port; one in ten has a stale VIP.
+    # The remaining ports belong to instances without an LB.
+    lbs = []
+    ports = []
+    for i in range(port_count):
+        ip = "10.%d.%d.%d" % (i >> 16 & 255, i >> 8 & 255, i & 255)
+        ports.append(Row(instance_id=i, ip=ip))
+        if i < lb_count:
+            lbs.append(Row(id=i, instance_id=i, vip_address="0.0.0.0" if i % 10 == 0 else ip))
+    return lbs, ports
+
+
+def nested_mismatches(lbs, ports):
+    mismatches = []
+    for lb in lbs:
+        for port in ports:
+            if lb.instance_id == port.instance_id and lb.vip_address != port.ip:
+                mismatches.append((lb, port.ip))
+    return mismatches
+
+
+def indexed_mismatches(lbs, ports):
+    return sync_config.find_vip_mismatches(lbs, sync_config.index_ports_by_instance(ports))
+
+
+def measure(func, lbs, ports):
+    number = 1 if func is nested_mismatches else 10
+    return min(timeit.repeat(lambda: func(lbs, ports), number=number, repeat=3)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-nested", type=int, default=50000000,
+                        help="largest LB x port product the nested loop is run for")
+    args = parser.parse_args()
+
+    rows = []
+    for lb_count, port_count in SIZES:
+        lbs, ports = make_rows(lb_count, port_count)
+        assert len(indexed_mismatches(lbs, ports)) == (lb_count + 9) // 10
+
+        nested = "skipped"
+        if lb_count * port_count <= args.max_nested:
+            nested = "%.1f" % measure(nested_mismatches, lbs, ports)
+        rows.append((lb_count, port_count, nested, "%.2f" % measure(indexed_mismatches, lbs, ports)))
+
+    benchutil.print_table(("lbs", "ports", "nested ms", "indexed ms"), rows)
+
+
+if __name__ == "__main__":
+    main()
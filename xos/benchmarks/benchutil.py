@@ -0,0 +1,76 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+import os
+import sys
+import types
+
+XOS_DIR = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+
+
+def add_path(*parts):
+    sys.path.insert(0, os.path.join(XOS_DIR, *parts))
+
+
+def require_xos_logger():
+    """lbaas_log imports xos.logger, which only exists in the XOS images.
+    Outside of them a stand-in on top of the logging module is installed;
+    the benchmarks replace the logger with a silent one either way."""
+    try:
+        import xos.logger
+    except ImportError:
+        module = types.ModuleType("xos.logger")
+        module.logging = logging
+        module.Logger = lambda level=logging.INFO: logging.getLogger("xos")
+        package = types.ModuleType("xos")
+        package.logger = module
+        sys.modules["xos"] = package
+        sys.modules["xos.logger"] = module
+
+
+def require_synchronizer_modules():
+    """sync_config.py loads its XOS config and the model accessor at import
+    time. Outside of the synchronizer image, stand-ins without models are
+    installed so that its pure functions can be measured."""
+    require_xos_logger()
+
+    try:
+        import xosconfig
+    except ImportError:
+        class Config(object):
+            @staticmethod
+            def init(*args, **kwargs):
+                pass
+
+            @staticmethod
+            def get(name):
+                raise KeyError(name)
+
+        module = types.ModuleType("xosconfig")
+        module.Config = Config
+        sys.modules["xosconfig"] = module
+
+    try:
+        import synchronizers.new_base.modelaccessor
+    except ImportError:
+        for name in ("synchronizers", "synchronizers.new_base", "synchronizers.new_base.modelaccessor"):
+            sys.modules[name] = types.ModuleType(name)
+
+
+def print_table(header, rows):
+    widths = [max(len(str(row[i])) for row in [header] + rows) for i in range(len(header))]
+    for row in [header] + rows:
+        print("  ".join(str(value).rjust(width) for value, width in zip(row, widths)))
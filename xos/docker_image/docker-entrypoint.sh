@@ -17,7 +17,9 @@
 #!/bin/sh
 set -e
 
-CFG_FILE="/usr/local/etc/haproxy/haproxy.cfg"
+CFG_DIR="/usr/local/etc/haproxy"
+CFG_FILE="$CFG_DIR/haproxy.cfg"
+LOG_FILE="/haproxy_reload.log"
 
 # first arg is `-f` or `--some-option`
 if [ "${1#-}" != "$1" ]; then
@@ -25,17 +27,21 @@ if [ "${1#-}" != "$1" ]; then
 fi
 
 if [ "$1" = 'haproxy' ]; then
-        # if the user wants "haproxy", let's use "haproxy-systemd-wrapper" instead so we can have proper reloadability implemented by upstream
+        # run haproxy in master-worker mode in the foreground; the master
+        # re-reads the config and replaces its workers on SIGUSR2
         shift # "haproxy"
-        set -- "$(which haproxy-systemd-wrapper)" -p /run/haproxy.pid "$@"
+        set -- haproxy -W -db -p /run/haproxy.pid "$@"
 fi
 
-while [ ! -f "$CFG_FILE" ]:
+# Block until the synchronizer drops the first config into the volume. The
+# timeout only covers a file that shows up between the test and the watch.
+mkdir -p $CFG_DIR
+while [ ! -f "$CFG_FILE" ]
 do
-    echo "`date` Not found $CFG_FILE" >> /cksum.log
-    sleep 2
+    echo "`date` Not found $CFG_FILE" >> $LOG_FILE
+    inotifywait -qq -t 30 -e create -e moved_to $CFG_DIR || true
 done
 
-echo "`date` Found $CFG_FILE" >> /cksum.log
-/cksum.sh &
+echo "`date` Found $CFG_FILE" >> $LOG_FILE
+/bin/bash /reload_watch.sh &
 exec "$@"
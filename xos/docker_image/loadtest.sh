@@ -0,0 +1,113 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+#!/bin/bash
+# Measures how haproxy throughput scales with nbthread in the lbaas image.
+#
+# Everything runs on this host with host networking: one backend container
+# answering on BACKEND_PORTS with a fixed 200, one loadbalancer container
+# per thread count in THREADS pinned to that many CPUs, and wrk as the
+# client. Needs docker, wrk, taskset and the lbaas image (make lbaas).
+#
+#   ./loadtest.sh
+#   THREADS="1 2 4 8" DURATION=30 ./loadtest.sh
+
+IMAGE=${IMAGE:-lbaas}
+THREADS=${THREADS:-"1 2 4"}
+DURATION=${DURATION:-20}
+CONNECTIONS=${CONNECTIONS:-256}
+LB_PORT=${LB_PORT:-8080}
+BACKEND_PORTS=${BACKEND_PORTS:-"9001 9002 9003 9004"}
+
+# Keep the backend and the client off the loadbalancer's CPUs, which are
+# always allocated from 0 upwards.
+NCPU=`nproc`
+BACKEND_CPUS=${BACKEND_CPUS:-"$((NCPU / 2))-$((NCPU * 3 / 4 - 1))"}
+CLIENT_CPUS=${CLIENT_CPUS:-"$((NCPU * 3 / 4))-$((NCPU - 1))"}
+CLIENT_THREADS=${CLIENT_THREADS:-$((NCPU / 4))}
+
+WORK_DIR=`mktemp -d`
+trap 'docker rm -f lbaas-loadtest-lb lbaas-loadtest-backend > /dev/null 2>&1; rm -rf $WORK_DIR' EXIT
+
+mkdir -p $WORK_DIR/backend $WORK_DIR/lb
+
+cat > $WORK_DIR/backend/haproxy.cfg <<CFG
+global
+    maxconn 100000
+    nbthread 4
+
+defaults
+    mode http
+    timeout connect 5000
+    timeout client  50000
+    timeout server  50000
+
+frontend backend
+$(for port in $BACKEND_PORTS; do echo "    bind 127.0.0.1:$port"; done)
+    http-request return status 200 content-type text/plain string ok
+CFG
+
+docker run -d --name lbaas-loadtest-backend --network host --cpuset-cpus $BACKEND_CPUS \
+    -v $WORK_DIR/backend:/usr/local/etc/haproxy $IMAGE > /dev/null || exit 1
+
+printf "%-8s %-14s %-14s\n" "threads" "req/s" "req/s/thread"
+
+for nbthread in $THREADS
+do
+    if [ $nbthread -gt $((NCPU / 2)) ]
+    then
+        echo "skip nbthread=$nbthread, only $((NCPU / 2)) CPUs are left for the loadbalancer"
+        continue
+    fi
+
+    cat > $WORK_DIR/lb/haproxy.cfg <<CFG
+global
+    maxconn 100000
+    nbthread $nbthread
+    cpu-map auto:1/1-$nbthread 0-$((nbthread - 1))
+
+defaults
+    mode http
+    timeout connect 5000
+    timeout client  50000
+    timeout server  50000
+
+frontend loadtest
+    bind 127.0.0.1:$LB_PORT
+    http-reuse safe
+    default_backend loadtest
+
+backend loadtest
+    balance roundrobin
+$(for port in $BACKEND_PORTS; do echo "    server s$port 127.0.0.1:$port"; done)
+CFG
+
+    docker run -d --name lbaas-loadtest-lb --network host --cpuset-cpus 0-$((nbthread - 1)) \
+        -v $WORK_DIR/lb:/usr/local/etc/haproxy $IMAGE > /dev/null || exit 1
+
+    # Wait until the frontend answers, then warm up for a couple of seconds.
+    for i in `seq 50`
+    do
+        curl -s -o /dev/null http://127.0.0.1:$LB_PORT/ && break
+        sleep 0.2
+    done
+    taskset -c $CLIENT_CPUS wrk -t $CLIENT_THREADS -c $CONNECTIONS -d 2 http://127.0.0.1:$LB_PORT/ > /dev/null
+
+    RPS=`taskset -c $CLIENT_CPUS wrk -t $CLIENT_THREADS -c $CONNECTIONS -d $DURATION http://127.0.0.1:$LB_PORT/ \
+        | awk '/^Requests\/sec:/ {print $2}'`
+    printf "%-8s %-14s %-14s\n" $nbthread $RPS `echo "$RPS $nbthread" | awk '{printf "%.0f", $1 / $2}'`
+
+    docker rm -f lbaas-loadtest-lb > /dev/null
+done
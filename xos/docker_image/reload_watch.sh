@@ -0,0 +1,116 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+#!/bin/bash
+# Reload haproxy when haproxy.cfg is replaced. The synchronizer writes the
+# file to a temp name and renames it into place, so we watch the directory
+# for moved_to (and close_write, for in-place editors) instead of polling.
+CFG_DIR="/usr/local/etc/haproxy"
+CFG_NAME="haproxy.cfg"
+CFG_FILE="$CFG_DIR/$CFG_NAME"
+STATUS_FILE="$CFG_FILE.status"
+LOG_FILE="/haproxy_reload.log"
+
+# Writes that land within SETTLE_TIME seconds of each other are folded
+# into a single reload.
+SETTLE_TIME=${SETTLE_TIME:-0.2}
+
+LAST_CKSUM=`cksum $CFG_FILE | awk '{print $1}'`
+LAST_HASH=`sed -n 's/^#Config hash : //p' $CFG_FILE`
+
+log()
+{
+    echo "`date` $1" >> $LOG_FILE
+}
+
+# The synchronizer only records a config hash as applied once this file
+# names it as "applied"; "rejected" and "failed" make the sync fail and be
+# retried. The file sits next to haproxy.cfg in the instance volume.
+report()
+{
+    echo "$1 $2" > $STATUS_FILE.tmp
+    mv $STATUS_FILE.tmp $STATUS_FILE
+}
+
+reload_config()
+{
+    START=$1
+
+    CUR_CKSUM=`cksum $CFG_FILE | awk '{print $1}'`
+    if [ "$CUR_CKSUM" = "$LAST_CKSUM" ]
+    then
+        log "Unchanged $CFG_FILE, skip reload"
+        report "$LAST_HASH" applied
+        return
+    fi
+
+    # The synchronizer applies member changes through the runtime API and
+    # then rewrites the file with "#Runtime base" set to the config they
+    # were applied on top of. If haproxy runs that config, it already runs
+    # the new one.
+    CUR_HASH=`sed -n 's/^#Config hash : //p' $CFG_FILE`
+    BASE_HASH=`sed -n 's/^#Runtime base : //p' $CFG_FILE`
+    if [ -n "$BASE_HASH" ] && [ "$BASE_HASH" = "$LAST_HASH" ]
+    then
+        LAST_CKSUM=$CUR_CKSUM
+        LAST_HASH=$CUR_HASH
+        log "Changes in $CFG_FILE were applied through the runtime API, skip reload"
+        report "$CUR_HASH" applied
+        return
+    fi
+
+    if ! OUTPUT=`haproxy -c -f $CFG_FILE 2>&1`
+    then
+        log "Invalid $CFG_FILE, keep running config: $OUTPUT"
+        report "$CUR_HASH" rejected
+        return
+    fi
+
+    if service haproxy reload > /dev/null 2>&1
+    then
+        LAST_CKSUM=$CUR_CKSUM
+        LAST_HASH=$CUR_HASH
+        END=`date +%s%N`
+        log "Reload $CFG_FILE ($(( (END - START) / 1000000 ))ms after change)"
+        report "$CUR_HASH" applied
+    else
+        log "Failed to reload $CFG_FILE"
+        report "$CUR_HASH" failed
+    fi
+}
+
+log "Start reload_watch.sh"
+
+# haproxy is started on the config found at startup.
+if haproxy -c -f $CFG_FILE > /dev/null 2>&1
+then
+    report "$LAST_HASH" applied
+else
+    report "$LAST_HASH" rejected
+fi
+
+inotifywait -m -q -e close_write -e moved_to --format '%f' $CFG_DIR | while read FILE
+do
+    [ "$FILE" = "$CFG_NAME" ] || continue
+
+    START=`date +%s%N`
+    while read -t $SETTLE_TIME FILE
+    do
+        :
+    done
+
+    reload_config $START
+done
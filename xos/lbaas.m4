@@ -77,6 +77,21 @@ node_types:
             provisioning_status:
                 type: string
                 required: false
+            max_connections:
+                type: integer
+                required: false
+            nbthread:
+                type: integer
+                required: false
+            cpu_set:
+                type: string
+                required: false
+            tls_session_cache_size:
+                type: integer
+                required: false
+            tls_session_lifetime:
+                type: integer
+                required: false
 
     tosca.nodes.Listener:
         derived_from: tosca.nodes.Root
@@ -110,6 +125,27 @@ node_types:
             connection_limit:
                 type: integer
                 required: false
+            timeout_client_data:
+                type: integer
+                required: false
+            keepalive_mode:
+                type: string
+                required: false
+            default_tls_container_ref:
+                type: string
+                required: false
+            cache_size_mb:
+                type: integer
+                required: false
+            cache_max_age:
+                type: integer
+                required: false
+            cache_max_object_size:
+                type: integer
+                required: false
+            compression_types:
+                type: string
+                required: false
 
     tosca.nodes.Pool:
         derived_from: tosca.nodes.Root
@@ -144,6 +180,21 @@ node_types:
             status:
                 type: string
                 required: false
+            timeout_member_connect:
+                type: integer
+                required: false
+            timeout_member_data:
+                type: integer
+                required: false
+            member_connection_limit:
+                type: integer
+                required: false
+            member_queue_limit:
+                type: integer
+                required: false
+            http_reuse:
+                type: string
+                required: false
 
     tosca.nodes.Member:
         derived_from: tosca.nodes.Root
@@ -14,23 +14,15 @@
 # limitations under the License.
 
 
-#!/bin/sh
-CFG_FILE="/usr/local/etc/haproxy/haproxy.cfg"
-OLD_CKSUM=""
-CUR_CKSUM=""
+#!/bin/bash
 
-echo "`date` Start cksum.sh" >> /cksum.log
+source ./config.sh
 
-while :
-do
-    CUR_CKSUM=`cksum $CFG_FILE | awk '{print $1}'`
+if [[ "$#" -ne 1 ]]; then
+    echo "Syntax: $0 <listener_id>"
+    exit -1
+fi
 
-    if [ "$CUR_CKSUM" != "$OLD_CKSUM" ] && [ "$OLD_CKSUM" != "" ]
-    then
-        service haproxy reload
-        echo "`date` Reload $CFG_FILE" >> /cksum.log
-    fi
+LISTENER_ID=$1
 
-    sleep 2
-    OLD_CKSUM=$CUR_CKSUM
-done
+curl -H "Accept: application/json; indent=4" -u $AUTH -X GET $HOST/api/tenant/listeners/$LISTENER_ID/stats/
@@ -0,0 +1,27 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+#!/bin/bash
+
+source ./config.sh
+if [[ "$#" -lt 1 ]]; then
+    echo "Syntax: $0 <loadbalancer_id> [<loadbalancer_id> ...]"
+    exit -1
+fi
+
+LB_IDS=`echo "$@" | tr ' ' ','`
+
+curl -H "Accept: application/json; indent=4" -u $AUTH -X GET "$HOST/api/tenant/loadbalancers/statuses/?ids=$LB_IDS"
@@ -0,0 +1,41 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+#!/bin/bash
+
+# Creates a self-signed certificate bundle for testing HTTPS listeners. Run
+# it on the synchronizer host; the bundle is written to the certificate
+# store as <ref>.pem and is then usable as default_tls_container_ref.
+
+if [[ "$#" -lt 1 ]]; then
+    echo "Syntax: $0 <ref> [<common_name>]"
+    exit -1
+fi
+
+REF=$1
+CN=${2:-lbaas.test}
+CERT_DIR=${LBAAS_CERT_DIR:-/opt/xos/lbaas_certs}
+
+TMP_DIR=`mktemp -d`
+trap 'rm -rf $TMP_DIR' EXIT
+
+openssl req -x509 -newkey rsa:2048 -nodes -days 365 -subj "/CN=$CN" \
+    -keyout $TMP_DIR/key.pem -out $TMP_DIR/cert.pem || exit 1
+
+mkdir -p $CERT_DIR
+cat $TMP_DIR/cert.pem $TMP_DIR/key.pem > $CERT_DIR/$REF.pem
+chmod 600 $CERT_DIR/$REF.pem
+
+echo "$CERT_DIR/$REF.pem"
@@ -0,0 +1,44 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+#!/bin/bash
+
+source ./config.sh
+
+if [[ "$#" -lt 3 ]] || [[ $(( ($# - 1) % 2 )) -ne 0 ]]; then
+    echo "Syntax: $0 <loadbalancer_id> <listener_id> <pool_id> [<listener_id> <pool_id> ...]"
+    exit -1
+fi
+
+LB_ID=$1
+shift
+
+LISTENERS=""
+while [[ "$#" -gt 0 ]]; do
+    if [[ -n "$LISTENERS" ]]; then
+        LISTENERS="$LISTENERS,"
+    fi
+    LISTENERS="$LISTENERS{\"listener_id\": \"$1\", \"default_pool_id\": \"$2\"}"
+    shift 2
+done
+
+DATA=$(cat <<EOF
+{
+    "listeners": [$LISTENERS]
+}
+EOF
+)
+
+curl -H "Accept: application/json; indent=4" -H "Content-Type: application/json" -u $AUTH -X PUT -d "$DATA" $HOST/api/tenant/loadbalancers/$LB_ID/
@@ -0,0 +1,166 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import hashlib
+import json
+import re
+import shutil
+import tempfile
+import threading
+import time
+
+import jinja2
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             "steps/roles/copy_haproxy_config/templates/haproxy.cfg.j2")
+INSTANCE_VOLUME_DIR = "/opt/xos/instance_volume"
+
+# PEM bundles (certificate chain and private key) that a Listener's
+# default_tls_container_ref names, as <ref>.pem. They are copied next to
+# haproxy.cfg, which the container sees as /usr/local/etc/haproxy.
+CERT_DIR = os.environ.get("LBAAS_CERT_DIR", "/opt/xos/lbaas_certs")
+
+# A ref is a plain file name in CERT_DIR. The REST API checks it too, but
+# TOSCA recipes and direct model writes do not go through it.
+TLS_REF_PATTERN = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]*\Z")
+
+_lock = threading.Lock()
+_template = None
+_template_mtime = None
+
+
+def get_template():
+    # The template is compiled once and reused until the file changes.
+    global _template, _template_mtime
+
+    mtime = os.path.getmtime(TEMPLATE_PATH)
+    with _lock:
+        if _template is None or _template_mtime != mtime:
+            with open(TEMPLATE_PATH) as f:
+                source = f.read()
+            # Same whitespace handling as Ansible's template module.
+            env = jinja2.Environment(trim_blocks=True, undefined=jinja2.StrictUndefined)
+            _template = env.from_string(source)
+            _template_mtime = mtime
+
+        return _template
+
+
+def render(context):
+    return get_template().render(**context)
+
+
+def serialize_context(context):
+    # Each sub-object becomes sorted, single-line JSON, which the playbook's
+    # YAML vars parse directly and which keeps the config hash stable.
+    return dict((name, json.dumps(value, separators=(',', ': '), sort_keys=True))
+                for name, value in context.items())
+
+
+def is_valid_certificate_ref(ref):
+    if not ref or not TLS_REF_PATTERN.match(ref):
+        return False
+    path = os.path.normpath(os.path.join(CERT_DIR, "%s.pem" % ref))
+    return os.path.dirname(path) == os.path.normpath(CERT_DIR)
+
+
+def get_certificate_path(ref):
+    if not is_valid_certificate_ref(ref):
+        raise ValueError("invalid default_tls_container_ref (%r)" % ref)
+    return os.path.join(CERT_DIR, "%s.pem" % ref)
+
+
+def get_certificate_hash(ref):
+    """Returns the sha1 of the certificate bundle, or None if there is none.
+    The hash is rendered into haproxy.cfg, so a rotated certificate changes
+    the file and gets haproxy reloaded. An invalid ref has no bundle."""
+    if not is_valid_certificate_ref(ref):
+        return None
+    try:
+        with open(get_certificate_path(ref), "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except IOError:
+        return None
+
+
+def write_certificates(instance_id, refs):
+    cert_dir = os.path.join(INSTANCE_VOLUME_DIR, str(instance_id), "certs")
+    if not os.path.isdir(cert_dir):
+        os.makedirs(cert_dir, 0o700)
+
+    for ref in refs:
+        source = get_certificate_path(ref)
+        path = os.path.join(cert_dir, "%s.pem" % ref)
+        fd, tmp_path = tempfile.mkstemp(dir=cert_dir, prefix=".cert.")
+        os.close(fd)
+        try:
+            shutil.copyfile(source, tmp_path)
+            os.chmod(tmp_path, 0o600)
+            os.rename(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+def write_atomic(path, content):
+    # Write to a temporary file in the same directory and rename it over the
+    # old one, so haproxy never sees a partially written file.
+    dirname = os.path.dirname(path)
+    if not os.path.isdir(dirname):
+        os.makedirs(dirname)
+
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix=".haproxy.cfg.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(content)
+        os.chmod(tmp_path, 0o644)
+        os.rename(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_config(instance_id, context):
+    path = os.path.join(INSTANCE_VOLUME_DIR, str(instance_id), "haproxy.cfg")
+    write_atomic(path, render(context))
+    return path
+
+
+def get_config_status(instance_id, config_hash):
+    """Returns what reload_watch.sh in the container reported for the config
+    with config_hash: "applied", "rejected" or "failed", or None if it has
+    not reported on that config (yet)."""
+    path = os.path.join(INSTANCE_VOLUME_DIR, str(instance_id), "haproxy.cfg.status")
+    try:
+        with open(path) as f:
+            words = f.read().split()
+    except IOError:
+        return None
+
+    if len(words) == 2 and words[0] == config_hash:
+        return words[1]
+    return None
+
+
+def wait_for_config_status(instance_id, config_hash, timeout):
+    deadline = time.time() + timeout
+    while True:
+        status = get_config_status(instance_id, config_hash)
+        if status is not None or time.time() >= deadline:
+            return status
+        time.sleep(0.1)
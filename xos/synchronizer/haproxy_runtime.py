@@ -0,0 +1,187 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import re
+import socket
+
+RUNTIME_API_PORT = 9999
+STATS_API_PORT = 9998
+
+SOURCE_PATTERN = re.compile(r"^[0-9A-Fa-f.:]+(/[0-9]{1,3})?$")
+
+# Beginnings of the replies haproxy gives when "add server", "del server"
+# and "set server ... addr" succeed. The other commands used here answer
+# with an empty line on success. Any other reply is a failure.
+ADD_SERVER_REPLIES = ("New server registered.",)
+DEL_SERVER_REPLIES = ("Server deleted.",)
+SET_ADDR_REPLIES = ("IP changed from", "no need to change the addr")
+
+
+def parse_sources(value):
+    sources = value.replace(",", " ").split()
+    for source in sources:
+        if not SOURCE_PATTERN.match(source):
+            raise ValueError("invalid source address (%s)" % source)
+    return sources
+
+
+# The runtime API is reached over TCP through a proxy in haproxy.cfg that
+# only accepts these source addresses (IPs or CIDRs). RUNTIME_API_SOURCES
+# get the admin level socket and should be just the synchronizer;
+# STATS_API_SOURCES get an operator level one, enough for "show stat", for
+# the XOS API serving listener stats. Neither port is opened while its list
+# is empty, and member changes are then applied by rewriting the config.
+RUNTIME_API_SOURCES = parse_sources(os.environ.get("LBAAS_RUNTIME_API_SOURCES", ""))
+STATS_API_SOURCES = parse_sources(os.environ.get("LBAAS_STATS_API_SOURCES", ""))
+
+
+class RuntimeAPIError(Exception):
+    pass
+
+
+class RuntimeAPI(object):
+    """Minimal client for the haproxy runtime API (the admin stats socket).
+    Each command uses its own connection, as haproxy closes the socket after
+    answering when not in interactive mode."""
+
+    def __init__(self, host, port=RUNTIME_API_PORT, timeout=2.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def execute(self, command, replies=()):
+        """Runs command and returns its reply. It must start with one of
+        `replies`, or be empty when none are given; anything else raises
+        RuntimeAPIError."""
+        sock = socket.create_connection((self.host, self.port), self.timeout)
+        try:
+            sock.sendall((command + "\n").encode("utf-8"))
+            chunks = []
+            while True:
+                data = sock.recv(4096)
+                if not data:
+                    break
+                chunks.append(data)
+        finally:
+            sock.close()
+
+        reply = b"".join(chunks).decode("utf-8", "replace").strip()
+        if reply.startswith(replies) if replies else reply == "":
+            return reply
+
+        raise RuntimeAPIError("'%s' failed: %s" % (command, reply or "empty reply"))
+
+    def set_weight(self, backend, server, weight):
+        return self.execute("set server %s/%s weight %d" % (backend, server, weight))
+
+    def set_state(self, backend, server, state):
+        return self.execute("set server %s/%s state %s" % (backend, server, state))
+
+    def set_addr(self, backend, server, address, port):
+        return self.execute("set server %s/%s addr %s port %d" % (backend, server, address, port),
+                            SET_ADDR_REPLIES)
+
+    def add_server(self, backend, server, address, port, options):
+        # Only available from haproxy 2.4; older versions answer
+        # "Unknown command", which makes the caller rewrite the config.
+        return self.execute("add server %s/%s %s:%d %s" % (backend, server, address, port, options),
+                            ADD_SERVER_REPLIES)
+
+    def del_server(self, backend, server):
+        return self.execute("del server %s/%s" % (backend, server), DEL_SERVER_REPLIES)
+
+
+def get_server_options(member, pool):
+    options = "weight %d" % member['weight']
+    health_monitor = pool.get('health_monitor')
+    if health_monitor:
+        options += " check inter %ds fall %d" % (health_monitor['delay'], health_monitor['max_retries'])
+    if pool.get('protocol', '').upper() == "HTTPS":
+        options += " ssl verify none"
+    elif health_monitor and health_monitor['type'] == "HTTPS":
+        options += " check-ssl verify none"
+    if pool.get('member_connection_limit', -1) > 0:
+        options += " maxconn %d" % pool['member_connection_limit']
+    if pool.get('member_queue_limit', -1) > 0:
+        options += " maxqueue %d" % pool['member_queue_limit']
+    if not member.get('admin_state_up', True):
+        options += " disabled"
+    return options
+
+
+def get_member_changes(old, new):
+    """Returns the runtime operations that turn the running configuration
+    rendered from context `old` into the one for `new`, as (op, pool,
+    member) tuples, or None when anything other than pool
+    members changed and the configuration has to be rewritten."""
+
+    for name in ('loadbalancer', 'listeners'):
+        if old.get(name) != new.get(name):
+            return None
+
+    old_pools = old['pools']
+    new_pools = new['pools']
+    if [pool['pool_id'] for pool in old_pools] != [pool['pool_id'] for pool in new_pools]:
+        return None
+
+    changes = []
+    for old_pool, new_pool in zip(old_pools, new_pools):
+        for name in new_pool:
+            if name != 'members' and old_pool.get(name) != new_pool[name]:
+                return None
+
+        old_members = dict((m['member_id'], m) for m in old_pool['members'])
+        new_members = dict((m['member_id'], m) for m in new_pool['members'])
+
+        for member_id, member in new_members.items():
+            prev = old_members.get(member_id)
+            if prev is None:
+                changes.append(('add', new_pool, member))
+                continue
+            if (prev['address'], prev['protocol_port']) != (member['address'], member['protocol_port']):
+                changes.append(('addr', new_pool, member))
+            if prev['weight'] != member['weight']:
+                changes.append(('weight', new_pool, member))
+            if prev.get('admin_state_up', True) != member.get('admin_state_up', True):
+                changes.append(('state', new_pool, member))
+
+        for member_id, member in old_members.items():
+            if member_id not in new_members:
+                changes.append(('del', new_pool, member))
+
+    return changes
+
+
+def apply_member_changes(api, changes):
+    for op, pool, member in changes:
+        backend = pool['pool_id']
+        server = member['member_id']
+        if op == 'add':
+            api.add_server(backend, server, member['address'], member['protocol_port'],
+                           get_server_options(member, pool))
+            if pool.get('health_monitor'):
+                api.execute("enable health %s/%s" % (backend, server))
+            if member.get('admin_state_up', True):
+                api.set_state(backend, server, "ready")
+        elif op == 'del':
+            api.set_state(backend, server, "maint")
+            api.del_server(backend, server)
+        elif op == 'addr':
+            api.set_addr(backend, server, member['address'], member['protocol_port'])
+        elif op == 'weight':
+            api.set_weight(backend, server, member['weight'])
+        elif op == 'state':
+            api.set_state(backend, server, "ready" if member.get('admin_state_up', True) else "maint")
@@ -14,31 +14,68 @@
 # limitations under the License.
 
 
-import inspect
+import os
+import sys
 
 from xos.logger import Logger, logging
 from os.path import basename
 
-logger = Logger(level=logging.DEBUG)
-logger.setLevel(logging.DEBUG)
+LEVELS = {"debug": logging.DEBUG,
+          "info": logging.INFO,
+          "warning": logging.WARNING,
+          "error": logging.ERROR,
+          "critical": logging.CRITICAL}
+
+
+def get_configured_level():
+    # LBAAS_LOG_LEVEL overrides logging.level of the synchronizer config.
+    # Config.get() fails when no config was loaded, for instance in tools
+    # that import this module; INFO is used then.
+    name = os.environ.get("LBAAS_LOG_LEVEL")
+    if not name:
+        try:
+            from xosconfig import Config
+            name = Config.get("logging.level")
+        except Exception:
+            name = None
+    return LEVELS.get(str(name).lower(), logging.INFO)
+
+
+level = get_configured_level()
+logger = Logger(level=level)
+logger.setLevel(level)
+
+
+def set_level(new_level):
+    global level
+    level = new_level
+    logger.setLevel(new_level)
+
+
+def debug_enabled():
+    return level <= logging.DEBUG
+
+
+def _log(log_func, msg_level, msg):
+    # Skip the caller lookup and formatting entirely for disabled levels.
+    if msg_level < level:
+        return
+
+    # Frame 0 is _log() and frame 1 is debug()/info()/error(), so the
+    # caller is two frames up. sys._getframe() only walks frame pointers,
+    # unlike inspect.stack() which reads source context for every frame.
+    frame = sys._getframe(2)
+    code = frame.f_code
+    log_func("%s:%d %s()  %s" % (basename(code.co_filename), frame.f_lineno, code.co_name, msg))
 
 
 def debug(msg):
-    logger.debug(basename(str(inspect.stack()[1][1])) + ':' +
-                 str(inspect.stack()[1][2]) + ' ' +
-                 str(inspect.stack()[1][3]) + '()  ' +
-                 str(msg))
+    _log(logger.debug, logging.DEBUG, msg)
 
 
 def info(msg):
-    logger.info(basename(str(inspect.stack()[1][1])) + ':' +
-                str(inspect.stack()[1][2]) + ' ' +
-                str(inspect.stack()[1][3]) + '()  ' +
-                str(msg))
+    _log(logger.info, logging.INFO, msg)
 
 
 def error(msg):
-    logger.error(basename(str(inspect.stack()[1][1])) + ':' +
-                 str(inspect.stack()[1][2]) + ' ' +
-                 str(inspect.stack()[1][3]) + '()  ' +
-                 str(msg))
+    _log(logger.error, logging.ERROR, msg)
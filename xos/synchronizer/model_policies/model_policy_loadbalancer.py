@@ -14,6 +14,8 @@
 # limitations under the License.
 
 
+import os
+
 from synchronizers.new_base.modelaccessor import *
 from synchronizers.new_base.policy import Policy
 from synchronizers.new_base.exceptions import *
@@ -21,6 +23,39 @@ from synchronizers.new_base.exceptions import *
 from synchronizers.new_base.model_policies.model_policy_tenantwithcontainer import Scheduler
 from synchronizers.new_base.model_policies.model_policy_tenantwithcontainer import LeastLoadedNodeScheduler
 
+# haproxy threads for a Loadbalancer whose nbthread is 0, by the flavor of
+# its instance. Flavors that are not listed get a single thread.
+FLAVOR_THREADS = {"m1.tiny": 1, "m1.small": 1, "m1.medium": 2, "m1.large": 4, "m1.xlarge": 8}
+
+# CPUs a compute node offers for pinning haproxy threads, set per node in a
+# Tag with this name. Nodes without the tag use LBAAS_NODE_CPUS; 0 disables
+# pinning and leaves thread placement to the kernel.
+NODE_CPUS_TAG = "lbaas_node_cpus"
+NODE_CPUS = int(os.environ.get("LBAAS_NODE_CPUS", "0"))
+
+
+def parse_cpu_set(cpu_set):
+    cpus = set()
+    for part in cpu_set.replace(",", " ").split():
+        first, _, last = part.partition("-")
+        try:
+            cpus.update(range(int(first), int(last or first) + 1))
+        except ValueError:
+            pass
+
+    return cpus
+
+
+def format_cpu_set(cpus):
+    ranges = []
+    for cpu in cpus:
+        if ranges and ranges[-1][1] == cpu - 1:
+            ranges[-1][1] = cpu
+        else:
+            ranges.append([cpu, cpu])
+
+    return " ".join("%d" % first if first == last else "%d-%d" % (first, last) for first, last in ranges)
+
 
 class LoadbalancerPolicy(Policy):
     model_name = "Loadbalancer"
@@ -36,6 +71,44 @@ class LoadbalancerPolicy(Policy):
         # such as creating ports for containers.
         instance.save()
 
+    def get_node_cpus(self, node):
+        for tag in Tag.objects.filter(object_id=node.id, name=NODE_CPUS_TAG):
+            if tag.value.isdigit():
+                return int(tag.value)
+
+        return NODE_CPUS
+
+    def set_threads(self, tenant, flavor, node):
+        nbthread = FLAVOR_THREADS.get(flavor.name, 1)
+        node_cpus = self.get_node_cpus(node)
+        if node_cpus <= 0:
+            tenant.nbthread = nbthread
+            return
+
+        # CPUs pinned by the Loadbalancers currently on the node. The model
+        # accessor only does equality filters, so they are found through
+        # the node's instances.
+        used = {}
+        for instance in Instance.objects.filter(node_id=node.id):
+            if instance.deleted:
+                continue
+            for lb in Loadbalancer.objects.filter(instance_id=instance.id):
+                if lb.deleted or lb.id == tenant.id:
+                    continue
+                for cpu in parse_cpu_set(lb.cpu_set):
+                    cpu %= node_cpus
+                    used[cpu] = used.get(cpu, 0) + 1
+
+        # Take the first block of nbthread CPUs, wrapping around the end of
+        # the node, that no other Loadbalancer uses. When every block
+        # overlaps, take the least shared one.
+        nbthread = min(nbthread, node_cpus)
+        offset = min(range(node_cpus),
+                     key=lambda start: sum(used.get((start + i) % node_cpus, 0) for i in range(nbthread)))
+
+        tenant.nbthread = nbthread
+        tenant.cpu_set = format_cpu_set(sorted((offset + i) % node_cpus for i in range(nbthread)))
+
     def manage_container(self, tenant):
         if tenant.deleted:
             return
@@ -69,6 +142,9 @@ class LoadbalancerPolicy(Policy):
             assert(node.site_deployment.deployment is not None)
             assert(flavor is not None)
 
+            if tenant.nbthread == 0:
+                self.set_threads(tenant, flavor, node)
+
             try:
                 instance = Instance(slice=slice,
                                     node=node,
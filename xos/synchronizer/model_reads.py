@@ -0,0 +1,32 @@
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Number of ids beyond which read_by_id reads the whole table once.
+BY_ID_READ_LIMIT = 20
+
+
+def read_by_id(model, ids, key, **kwargs):
+    """Returns the rows of model whose `key` is one of ids, and that match
+    the equality filters in kwargs. The synchronizer's model accessor has no
+    `__in` lookup: a few ids are read one query each, more than
+    BY_ID_READ_LIMIT with a single read of the table filtered in memory."""
+    ids = set(id for id in ids if id is not None)
+    if len(ids) > BY_ID_READ_LIMIT:
+        objs = model.objects.filter(**kwargs) if kwargs else model.objects.all()
+        return [obj for obj in objs if getattr(obj, key) in ids]
+
+    objs = []
+    for id in ids:
+        objs.extend(model.objects.filter(**dict(kwargs, **{key: id})))
+    return objs
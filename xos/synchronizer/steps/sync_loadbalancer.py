@@ -17,9 +17,13 @@
 import os
 import sys
 import json
-import collections
+import hashlib
 import time
+import threading
 import lbaas_log as slog
+import haproxy_config
+import haproxy_runtime
+from model_reads import read_by_id
 
 from datetime import datetime
 from synchronizers.new_base.SyncInstanceUsingAnsible import SyncInstanceUsingAnsible
@@ -28,6 +32,141 @@ from synchronizers.new_base.modelaccessor import *
 parentdir = os.path.join(os.path.dirname(__file__), "..")
 sys.path.insert(0, parentdir)
 
+CONFIG_HASH_TAG = "haproxy_config_hash"
+
+# Port of the instance's stats API, empty while it is closed. The XOS API
+# reads it from this tag to collect listener stats.
+STATS_API_TAG = "haproxy_stats_api_port"
+
+# Fields that determine the rendered haproxy.cfg. update_time is left out on
+# purpose, it changes on every sync without changing the configuration.
+CONFIG_HASH_FIELDS = ('instance_id', 'loadbalancer', 'listeners', 'pools')
+
+# Template variables passed to the playbook, each as a JSON string.
+CONTEXT_FIELDS = ('loadbalancer', 'listeners', 'pools')
+
+# "direct" renders haproxy.cfg in-process into the instance volume instead of
+# running the Ansible playbook. It needs the synchronizer to share
+# /opt/xos/instance_volume with the node running the container; any failure
+# falls back to the playbook.
+RENDER_MODE = os.environ.get("LBAAS_RENDER_MODE", "ansible")
+
+# Seconds a push waits for the container to check the new haproxy.cfg with
+# `haproxy -c` and report the outcome. The config hash is only recorded once
+# haproxy accepted the config; a rejection or no report fails the sync.
+CONFIG_CHECK_TIMEOUT = int(os.environ.get("LBAAS_CONFIG_CHECK_TIMEOUT", "20"))
+
+# Upper bound on concurrent haproxy config pushes (playbook runs or direct
+# renders). The event loop syncs independent Loadbalancers from parallel
+# threads; this keeps a fan-out over hundreds of LBs from opening hundreds
+# of SSH sessions at once.
+SYNC_WORKERS = int(os.environ.get("LBAAS_SYNC_WORKERS", "8"))
+
+# Pushes to the same instance are serialized through a fixed set of locks
+# picked by instance id, so the set does not grow with every instance ever
+# synced. Two instances sharing a stripe only wait for each other.
+INSTANCE_LOCK_STRIPES = 64
+
+sync_slots = threading.BoundedSemaphore(SYNC_WORKERS)
+instance_locks = [threading.Lock() for i in range(INSTANCE_LOCK_STRIPES)]
+
+
+def get_instance_lock(instance_id):
+    return instance_locks[hash(instance_id) % INSTANCE_LOCK_STRIPES]
+
+
+class LoadbalancerSnapshot(object):
+    """The objects a Loadbalancer sync depends on, each read exactly once.
+    Both statuses and the template fields are computed from this.
+
+    frontends holds one (listener, pool) pair per listener rendered into the
+    haproxy process: the Loadbalancer's own listener and pool first, then
+    every LoadbalancerListener with its default pool.
+
+    The bindings take one query. Listeners, pools, members and health
+    monitors are then read with read_by_id: one query per distinct listener,
+    pool or health monitor (and per pool for its members), which is five
+    queries for a Loadbalancer without extra listeners. A table with more
+    than BY_ID_READ_LIMIT ids to read is read once in full instead."""
+
+    def __init__(self, lb):
+        self.lb = lb
+        bindings = list(LoadbalancerListener.objects.filter(loadbalancer_id=lb.id))
+
+        listeners = dict((obj.id, obj) for obj in
+                         read_by_id(Listener, [lb.listener_id] + [b.listener_id for b in bindings], "id"))
+        pools = dict((obj.id, obj) for obj in
+                     read_by_id(Pool, [lb.pool_id] + [b.default_pool_id for b in bindings], "id"))
+
+        self.listener = listeners.get(lb.listener_id)
+        self.pool = pools.get(lb.pool_id)
+
+        self.frontends = []
+        if self.listener is not None:
+            self.frontends.append((self.listener, self.pool))
+        for binding in bindings:
+            listener = listeners.get(binding.listener_id)
+            if listener is not None:
+                self.frontends.append((listener, pools.get(binding.default_pool_id)))
+
+        # A pool shared by several listeners is one backend.
+        self.pools = []
+        pool_ids = set()
+        for listener, pool in self.frontends:
+            if pool is not None and pool.id not in pool_ids:
+                pool_ids.add(pool.id)
+                self.pools.append(pool)
+
+        self.members = dict((pool.id, []) for pool in self.pools)
+        for member in read_by_id(Member, pool_ids, "memberpool_id"):
+            self.members[member.memberpool_id].append(member)
+
+        self.health_monitors = dict((obj.id, obj) for obj in
+                                    read_by_id(Healthmonitor, [pool.health_monitor_id for pool in self.pools], "id"))
+
+        # sha1 of every certificate bundle an HTTPS listener refers to, None
+        # when the bundle is missing from the certificate store.
+        self.certificates = {}
+        for listener, pool in self.frontends:
+            ref = listener.default_tls_container_ref
+            if listener.protocol.upper() == "HTTPS" and ref:
+                self.certificates[ref] = haproxy_config.get_certificate_hash(ref)
+
+    def get_members(self, pool):
+        return self.members.get(pool.id, [])
+
+    def get_health_monitor(self, pool):
+        return self.health_monitors.get(pool.health_monitor_id)
+
+    def get_pool_status(self, pool):
+        if len(self.get_members(pool)) == 0:
+            slog.error("Member information does not exist (memberpool_id=%s)" % pool.id)
+            return "ERROR"
+        if self.get_health_monitor(pool) is None:
+            slog.error("Healthmonitor information does not exist (id=%s)" % pool.health_monitor_id)
+            return "ERROR"
+        return "ACTIVE"
+
+    def get_loadbalancer_status(self):
+        if self.listener is None:
+            slog.error("Listener information does not exist (id=%s)" % self.lb.listener_id)
+            return "ERROR"
+        for listener, pool in self.frontends:
+            if pool is None:
+                slog.error("Pool information does not exist (listener_id=%s)" % listener.listener_id)
+                return "ERROR"
+            if listener.protocol.upper() == "HTTPS" and not haproxy_config.is_valid_certificate_ref(listener.default_tls_container_ref):
+                slog.error("Invalid default_tls_container_ref (listener_id=%s, default_tls_container_ref=%r)"
+                           % (listener.listener_id, listener.default_tls_container_ref))
+                return "ERROR"
+            if listener.protocol.upper() == "HTTPS" and self.certificates.get(listener.default_tls_container_ref) is None:
+                slog.error("Certificate does not exist (listener_id=%s, default_tls_container_ref=%s)"
+                           % (listener.listener_id, listener.default_tls_container_ref))
+                return "ERROR"
+            if self.get_pool_status(pool) != "ACTIVE":
+                return "ERROR"
+        return "ACTIVE"
+
 
 class SyncLoadbalancer(SyncInstanceUsingAnsible):
     provides = [Loadbalancer]
@@ -38,80 +177,27 @@ class SyncLoadbalancer(SyncInstanceUsingAnsible):
 
     def __init__(self, *args, **kwargs):
         super(SyncLoadbalancer, self).__init__(*args, **kwargs)
+        self.render_contexts = {}
+        self.applied_contexts = {}
 
-    def convert_unicode_to_str(self, data):
-        if isinstance(data, basestring):
-            return str(data)
-        elif isinstance(data, collections.Mapping):
-            return dict(map(self.convert_unicode_to_str, data.iteritems()))
-        elif isinstance(data, collections.Iterable):
-            return type(data)(map(self.convert_unicode_to_str, data))
-        else:
-            return data
-
-    def update_pool_status(self, pool_id):
-        pool_status = ""
-
-        pool = Pool.objects.get(id=pool_id)
-        members = Member.objects.filter(memberpool_id=pool.id)
-        if len(members) > 0:
-            try:
-                pool = Pool.objects.get(id=pool_id)
-            except Exception as err:
-                slog.error("%s (id=%s)" % ((str(err), pool_id)))
-                pool_status = "ERROR"
-
-            healths = Healthmonitor.objects.filter(id=pool.health_monitor_id)
-            if len(healths) > 0:
-                pool_status = "ACTIVE"
-            else:
-                slog.error("Healthmonitor information does not exist (id=%s)" % pool.health_monitor_id)
-                pool_status = "ERROR"
-        else:
-            slog.error("Member information does not exist (memberpool_id=%s)" % pool.id)
-            pool_status = "ERROR"
+    def update_status(self, snapshot):
+        lb_status = snapshot.get_loadbalancer_status()
+        slog.info("lb.provisioning_status=%s" % lb_status)
 
-        try:
-            pool = Pool.objects.get(id=pool_id)
-            pool.status = pool_status
-            pool.save()
-        except Exception as err:
-            slog.error("id does not exist in Pool table (id=%s)" % pool_id)
-
-        return pool_status
-
-    def update_loadbalancer_status(self, lb_id):
-        lb = Loadbalancer.objects.get(loadbalancer_id=lb_id)
-        if lb:
-            listeners = Listener.objects.filter(id=lb.listener_id)
-            for listener in listeners:
-                pools = Pool.objects.filter(id=lb.pool_id)
-                for pool in pools:
-                    members = Member.objects.filter(memberpool_id=pool.id)
-                    if len(members) > 0:
-                        healths = Healthmonitor.objects.filter(id=pool.health_monitor_id)
-                        if len(healths) > 0:
-                            lb.provisioning_status = "ACTIVE"
-                        else:
-                            slog.error("Healthmonitor information does not exist (id=%s)" % pool.health_monitor_id)
-                            lb.provisioning_status = "ERROR"
-                    else:
-                        slog.error("Member information does not exist (memberpool_id=%s)" % pool.id)
-                        lb.provisioning_status = "ERROR"
-                if len(pools) == 0:
-                    slog.error("Pool information does not exist (loadbalancer_id=%s, id=%s)" % (lb_id, lb.pool_id))
-                    lb.provisioning_status = "ERROR"
-            if len(listeners) == 0:
-                slog.error("Listener information does not exist (id=%s)" % lb.listener_id)
-                lb.provisioning_status = "ERROR"
-        else:
-            slog.error("Loadbalancer information does not exist (loadbalancer_id=%s)" % lb_id)
-            lb.provisioning_status = "ERROR"
+        # Only write statuses that actually changed.
+        for pool in snapshot.pools:
+            pool_status = snapshot.get_pool_status(pool)
+            if pool.status != pool_status:
+                slog.info("pool.status=%s (pool_id=%s)" % (pool_status, pool.pool_id))
+                pool.status = pool_status
+                pool.save(update_fields=['status'])
 
-        slog.info("lb.provisioning_status=%s" % lb.provisioning_status)
-        lb.save()
+        lb = snapshot.lb
+        if lb.provisioning_status != lb_status:
+            lb.provisioning_status = lb_status
+            lb.save(update_fields=['provisioning_status'])
 
-        return lb.provisioning_status
+        return lb_status
 
     # Gets the attributes that are used by the Ansible template but are not
     # part of the set of default attributes.
@@ -121,7 +207,7 @@ class SyncLoadbalancer(SyncInstanceUsingAnsible):
                   % (o.instance.instance_name, o.instance_id, o.instance.instance_uuid))
 
         try:
-            tags = Tag.objects.filter(object_id=o.instance.id)
+            tags = Tag.objects.filter(object_id=o.instance.id, name="chk_container_status")
 
             if not len(tags):
                 userdata = {}
@@ -141,113 +227,240 @@ class SyncLoadbalancer(SyncInstanceUsingAnsible):
         except Exception as e:
             slog.error("Instance.objects.get() failed - %s" % str(e))
 
-        lb_status = True
-        if self.update_pool_status(o.pool_id) != "ACTIVE":
-            slog.error("Pool status is not ACTIVE (pool_id=%s)" % o.pool_id)
-            lb_status = False
+        snapshot = LoadbalancerSnapshot(o)
+        lb_status = self.update_status(snapshot)
 
-        if self.update_loadbalancer_status(o.loadbalancer_id) != "ACTIVE":
+        if lb_status != "ACTIVE":
             slog.error("Loadbalancer status is not ACTIVE (loadbalancer_id=%s)" % o.loadbalancer_id)
-            lb_status = False
-
-        if not lb_status:
             return None
 
         fields = {}
         fields['instance_id'] = o.instance.id
         fields['update_time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         fields["baremetal_ssh"] = True
+        fields['cert_dir'] = haproxy_config.CERT_DIR
+
+        context = {}
 
         loadbalancer = {}
         loadbalancer['loadbalancer_id'] = o.loadbalancer_id
         loadbalancer['lb_name'] = o.name
         loadbalancer['vip_address'] = o.vip_address
-        fields['loadbalancer'] = json.dumps(loadbalancer, indent=4)
-
-        slog.info(">>>>> Loadbalancer")
-        slog.info("%s" % json.dumps(loadbalancer, indent=4))
-
-        try:
+        loadbalancer['runtime_port'] = haproxy_runtime.RUNTIME_API_PORT
+        loadbalancer['runtime_sources'] = " ".join(haproxy_runtime.RUNTIME_API_SOURCES)
+        loadbalancer['stats_api_port'] = haproxy_runtime.STATS_API_PORT
+        loadbalancer['stats_api_sources'] = " ".join(haproxy_runtime.STATS_API_SOURCES)
+        loadbalancer['max_connections'] = o.max_connections
+        # nbthread stays 0 only when the model policy did not size the
+        # container; haproxy would then start one thread per host CPU.
+        loadbalancer['nbthread'] = o.nbthread or 1
+        loadbalancer['cpu_set'] = o.cpu_set
+        loadbalancer['tls_session_cache_size'] = o.tls_session_cache_size
+        loadbalancer['tls_session_lifetime'] = o.tls_session_lifetime
+        loadbalancer['stat_port'] = snapshot.listener.stat_port
+        context['loadbalancer'] = loadbalancer
+
+        listener_list = []
+        for obj, pool in snapshot.frontends:
             listener = {}
-            obj = Listener.objects.get(id=o.listener_id)
             listener['listener_name'] = obj.name
             listener['listener_id'] = obj.listener_id
             listener['protocol'] = obj.protocol
             listener['protocol_port'] = obj.protocol_port
-            listener['stat_port'] = obj.stat_port
             listener['connection_limit'] = obj.connection_limit
-            fields['listener'] = json.dumps(listener, indent=4)
-
-            slog.info(">>>>> Listener")
-            slog.info("%s" % json.dumps(listener, indent=4))
-        except Exception as e:
-            slog.error("Listener.objects.get() failed - %s" % str(e))
-            return None
-
-        try:
+            listener['timeout_client_data'] = obj.timeout_client_data
+            listener['keepalive_mode'] = obj.keepalive_mode
+            listener['default_tls_container_ref'] = obj.default_tls_container_ref if obj.protocol.upper() == "HTTPS" else ""
+            listener['certificate_hash'] = snapshot.certificates.get(listener['default_tls_container_ref'])
+            listener['cache_size_mb'] = obj.cache_size_mb
+            listener['cache_max_age'] = obj.cache_max_age
+            listener['cache_max_object_size'] = obj.cache_max_object_size
+            listener['compression_types'] = obj.compression_types
+            listener['default_pool_id'] = pool.pool_id
+            listener_list.append(listener)
+
+        context['listeners'] = listener_list
+
+        pool_list = []
+        for obj in snapshot.pools:
             pool = {}
-            obj = Pool.objects.get(id=o.pool_id)
             pool['pool_name'] = obj.name
             pool['pool_id'] = obj.pool_id
             pool['health_monitor_id'] = obj.health_monitor_id
             pool['lb_algorithm'] = obj.lb_algorithm
             pool['protocol'] = obj.protocol
-            fields['pool'] = json.dumps(pool, indent=4)
+            pool['timeout_member_connect'] = obj.timeout_member_connect
+            pool['timeout_member_data'] = obj.timeout_member_data
+            pool['member_connection_limit'] = obj.member_connection_limit
+            pool['member_queue_limit'] = obj.member_queue_limit
+            pool['http_reuse'] = obj.http_reuse
 
-            slog.info(">>>>> Pool")
-            slog.info("%s" % json.dumps(pool, indent=4))
-        except Exception as e:
-            slog.error("Pool.objects.get() failed - %s" % str(e))
-            return None
-
-        try:
-            root_obj = {}
             member_list = []
-            root_obj['members'] = member_list
-
-            objs = Member.objects.filter(memberpool_id=o.pool_id)
-            for obj in objs:
+            for member in snapshot.get_members(obj):
                 member_obj = {}
-                member_obj['member_id'] = obj.member_id
-                member_obj['address'] = obj.address
-                member_obj['protocol_port'] = obj.protocol_port
-                member_obj['weight'] = obj.weight
+                member_obj['member_id'] = member.member_id
+                member_obj['address'] = member.address
+                member_obj['protocol_port'] = member.protocol_port
+                member_obj['weight'] = member.weight
+                member_obj['admin_state_up'] = member.admin_state_up
                 member_list.append(member_obj)
 
-            fields['members'] = json.dumps(root_obj, indent=4)
-
-            slog.info(">>>>> Members")
-            slog.info("%s" % json.dumps(root_obj, indent=4))
-        except Exception as e:
-            slog.error("Member.objects.get() failed - %s" % str(e))
+            pool['members'] = member_list
 
-        try:
             health_monitor = {}
-            obj = Healthmonitor.objects.get(id=pool['health_monitor_id'])
-
-            health_monitor['health_monitor_id'] = obj.health_monitor_id
-            health_monitor['type'] = obj.type
-            health_monitor['delay'] = obj.delay
-            health_monitor['max_retries'] = obj.max_retries
-            health_monitor['timeout'] = obj.timeout
-            health_monitor['http_method'] = obj.http_method
-            health_monitor['url_path'] = obj.url_path
-            health_monitor['expected_codes'] = obj.expected_codes
-            fields['health_monitor'] = json.dumps(health_monitor, indent=4)
-
-            slog.info(">>>>> Healthmonitor")
-            slog.info("%s" % json.dumps(health_monitor, indent=4))
-        except Exception as e:
-            slog.error("Healthmonitor.objects.get() failed - %s" % str(e))
+            health = snapshot.get_health_monitor(obj)
+            health_monitor['health_monitor_id'] = health.health_monitor_id
+            health_monitor['type'] = health.type
+            health_monitor['delay'] = health.delay
+            health_monitor['max_retries'] = health.max_retries
+            health_monitor['timeout'] = health.timeout
+            health_monitor['http_method'] = health.http_method
+            health_monitor['url_path'] = health.url_path
+            health_monitor['expected_codes'] = health.expected_codes
+            pool['health_monitor'] = health_monitor
+
+            pool_list.append(pool)
+
+        context['pools'] = pool_list
+
+        # Each sub-object is serialized once for the playbook. The direct
+        # render mode uses the dicts as they are.
+        serialized = haproxy_config.serialize_context(context)
+        fields.update(serialized)
+        if slog.debug_enabled():
+            for name, value in serialized.items():
+                slog.debug(">>>>> %s %s" % (name, value))
+
+        self.render_contexts[o.id] = context
 
         slog.info("===============================================================")
         slog.info(">>> curl command for haproxy test")
-        slog.info("curl %s:%s" % (loadbalancer['vip_address'], listener['protocol_port']))
-
-        fields = self.convert_unicode_to_str(fields)
+        for listener in listener_list:
+            slog.info("curl %s:%s" % (loadbalancer['vip_address'], listener['protocol_port']))
 
         return fields
 
+    def get_config_hash(self, fields):
+        content = json.dumps([fields.get(name) for name in CONFIG_HASH_FIELDS], sort_keys=True)
+        return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+    def save_instance_tag(self, o, name, value):
+        try:
+            tags = Tag.objects.filter(object_id=o.instance.id, name=name)
+            if len(tags):
+                tag = tags[0]
+                if tag.value == value:
+                    return
+                tag.value = value
+            else:
+                tag = Tag(service=o.instance.slice.service,
+                          content_type=o.instance.self_content_type_id,
+                          object_id=o.instance.id,
+                          name=name,
+                          value=value)
+            tag.save()
+        except Exception as e:
+            slog.error("Saving %s tag failed - %s" % (name, str(e)))
+
+    def save_stats_api_port(self, o):
+        port = str(haproxy_runtime.STATS_API_PORT) if haproxy_runtime.STATS_API_SOURCES else ""
+        self.save_instance_tag(o, STATS_API_TAG, port)
+
+    def run_playbook(self, o, fields, *args, **kwargs):
+        # Pushes to the same instance are serialized so the config hash
+        # check and update cannot interleave; different instances run
+        # concurrently up to SYNC_WORKERS.
+        with get_instance_lock(o.instance_id):
+            with sync_slots:
+                return self.push_config(o, fields, *args, **kwargs)
+
+    def push_config(self, o, fields, *args, **kwargs):
+        # Running the playbook costs an SSH session and, because the file
+        # changes, a haproxy reload. Skip it when the inputs that end up in
+        # haproxy.cfg are the same as in the last successful run.
+        config_hash = self.get_config_hash(fields)
+        context = self.render_contexts.pop(o.id, None)
+
+        tags = Tag.objects.filter(object_id=o.instance.id, name=CONFIG_HASH_TAG)
+        applied_hash = tags[0].value if len(tags) else None
+        if applied_hash == config_hash:
+            slog.info("haproxy config is unchanged, skipping playbook (loadbalancer_id=%s, hash=%s)"
+                      % (o.loadbalancer_id, config_hash))
+            self.save_stats_api_port(o)
+            return
+
+        fields = dict(fields, config_hash=config_hash, runtime_base_hash="",
+                      config_check_timeout=CONFIG_CHECK_TIMEOUT)
+
+        # Member-only changes go through the runtime API. haproxy.cfg is still
+        # rewritten afterwards, so that a later reload or restart does not
+        # bring back the old member state. runtime_base_hash names the config
+        # the changes were applied on top of; reload_watch.sh skips the reload
+        # when that is the config haproxy is running.
+        prev = self.applied_contexts.get(o.instance_id)
+        if context is not None and prev is not None and applied_hash and self.apply_runtime_changes(o, prev, context):
+            self.applied_contexts[o.instance_id] = context
+            fields['runtime_base_hash'] = applied_hash
+
+        if RENDER_MODE == "direct" and self.render_config(o, fields, context):
+            result = None
+            self.check_config_status(o, config_hash)
+        else:
+            # The playbook waits for the same report and fails without it.
+            result = super(SyncLoadbalancer, self).run_playbook(o, fields, *args, **kwargs)
+
+        self.save_instance_tag(o, CONFIG_HASH_TAG, config_hash)
+        self.save_stats_api_port(o)
+        self.applied_contexts[o.instance_id] = context
+
+        return result
+
+    def check_config_status(self, o, config_hash):
+        status = haproxy_config.wait_for_config_status(o.instance.id, config_hash, CONFIG_CHECK_TIMEOUT)
+        if status != "applied":
+            raise Exception("haproxy did not apply the new config (loadbalancer_id=%s, hash=%s, status=%s)"
+                            % (o.loadbalancer_id, config_hash, status or "no report"))
+
+    def apply_runtime_changes(self, o, prev, context):
+        if not context['loadbalancer']['runtime_sources']:
+            return False
+
+        changes = haproxy_runtime.get_member_changes(prev, context)
+        if changes is None:
+            return False
+
+        try:
+            api = haproxy_runtime.RuntimeAPI(o.vip_address, context['loadbalancer']['runtime_port'])
+            haproxy_runtime.apply_member_changes(api, changes)
+        except Exception as e:
+            slog.error("Runtime API update failed, rewriting config - %s" % str(e))
+            return False
+
+        slog.info("Applied %d member change(s) through the runtime API (loadbalancer_id=%s)"
+                  % (len(changes), o.loadbalancer_id))
+        return True
+
+    def render_config(self, o, fields, context):
+        try:
+            start = time.time()
+            if context is None:
+                context = {}
+                for name in CONTEXT_FIELDS:
+                    context[name] = json.loads(fields[name])
+            context = dict(context, update_time=fields['update_time'], config_hash=fields['config_hash'],
+                           runtime_base_hash=fields['runtime_base_hash'])
+
+            # Certificates go first; the container reloads on the config.
+            haproxy_config.write_certificates(fields['instance_id'],
+                                              [listener['default_tls_container_ref'] for listener in context['listeners']
+                                               if listener['default_tls_container_ref']])
+            path = haproxy_config.write_config(fields['instance_id'], context)
+            slog.info("Rendered %s in %.1fms" % (path, (time.time() - start) * 1000))
+            return True
+        except Exception as e:
+            slog.error("Direct rendering failed, falling back to playbook - %s" % str(e))
+            return False
+
     def delete_record(self, port):
         # Nothing needs to be done to delete an lbaas; it goes away
         # when the instance holding the lbaas is deleted.
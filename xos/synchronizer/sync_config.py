@@ -18,6 +18,8 @@ import importlib
 import os
 import sys
 import time
+import calendar
+import collections
 import datetime
 import threading
 import json
@@ -29,11 +31,66 @@ Config.init(config_file, 'synchronizer-config-schema.yaml')
 sys.path.insert(0, "/opt/xos")
 from synchronizers.new_base.modelaccessor import *
 import lbaas_log as slog
+from model_reads import read_by_id
 
+POLL_INTERVAL = 5
+FULL_SWEEP_INTERVAL = 60
+TAG_CACHE_SIZE = 4096
 
-def update_lb_vip_addr(instance_id, vip_address):
+# A poll re-reads the rows updated up to FEED_OVERLAP seconds before the
+# newest one already seen, so rows committed late or with the same
+# timestamp as the mark are not missed. Both loops only write what differs,
+# so seeing a row twice is harmless.
+FEED_OVERLAP = 30
+
+
+def rewind(mark, seconds):
+    if isinstance(mark, datetime.datetime):
+        return mark - datetime.timedelta(seconds=seconds)
+    return mark - seconds
+
+
+class ChangeFeed(object):
+    """Remembers the newest `updated` value seen for each model so that a
+    poll only returns the rows changed since about the previous poll.
+
+    `updated` does not move for every change: saves made by synchronizers,
+    such as Instance.backend_code or status fields written with
+    update_fields, leave it alone. The loops therefore also re-read, by id,
+    the rows they are waiting on, and a full sweep every
+    FULL_SWEEP_INTERVAL seconds catches the rest."""
+
+    def __init__(self, sweep_interval=FULL_SWEEP_INTERVAL):
+        self.sweep_interval = sweep_interval
+        self.high_water = {}
+        self.last_sweep = None
+
+    def start_cycle(self):
+        now = time.time()
+        if self.last_sweep is None or now - self.last_sweep >= self.sweep_interval:
+            self.last_sweep = now
+            return True
+        return False
+
+    def fetch(self, model, full=False, **kwargs):
+        name = model.__name__
+        mark = self.high_water.get(name)
+
+        if full or mark is None:
+            objs = model.objects.filter(**kwargs) if kwargs else model.objects.all()
+        else:
+            objs = model.objects.filter(updated__gte=rewind(mark, FEED_OVERLAP), **kwargs)
+
+        for obj in objs:
+            if mark is None or obj.updated > mark:
+                mark = obj.updated
+        self.high_water[name] = mark
+
+        return objs
+
+
+def update_lb_vip_addr(lb, vip_address):
     try:
-        lb = Loadbalancer.objects.get(instance_id=instance_id)
         lb.vip_address = vip_address
         lb.save(update_fields=['vip_address', 'updated'], always_update_timestamp=True)
     except Exception as err:
@@ -42,103 +99,224 @@ def update_lb_vip_addr(instance_id, vip_address):
     slog.info("lb.vip_address = %s" % lb.vip_address)
 
 
+def index_ports_by_instance(ports):
+    # An instance normally owns a single port; if it has several, the last
+    # one wins, which matches what the old nested loop ended up writing.
+    port_map = {}
+    for port in ports:
+        if port.instance_id is not None:
+            port_map[port.instance_id] = port
+    return port_map
+
+
+def find_vip_mismatches(lbs, port_map):
+    mismatches = []
+    for lb in lbs:
+        port = port_map.get(lb.instance_id)
+        if port is not None and lb.vip_address != port.ip:
+            mismatches.append((lb, port.ip))
+    return mismatches
+
+
 def check_lb_vip_address():
+    feed = ChangeFeed()
+
+    # Instances whose LB has no port address yet. The address is filled in
+    # by a synchronizer save, which does not move `updated`, so they are
+    # re-read on every poll until it shows up.
+    waiting = set()
+
     while True:
-        time.sleep(5)
-        lbs_list = []
-        ports_list = []
-
-        lbs = Loadbalancer.objects.all()
-        slog.info("lbs.count = %s" % len(lbs))
-
-        for lb in lbs:
-            lb_info = {}
-            lb_info['id'] = lb.id
-            lb_info['instance_id'] = lb.id
-            lb_info['vip_address'] = lb.vip_address
-            slog.info("[Loadbalancer] lb.id=%s, lb.instance_id=%s, lb.vip=%s"
-                      % (lb.id, lb.instance_id, lb.vip_address))
-            lbs_list.append(lb_info)
+        time.sleep(POLL_INTERVAL)
+        full = feed.start_cycle()
+
+        lbs = list(feed.fetch(Loadbalancer, full))
+        ports = list(feed.fetch(Port, full))
+        slog.info("full=%s, lbs.count = %s, ports.count = %s" % (full, len(lbs), len(ports)))
+
+        if not full:
+            # A changed port may belong to an unchanged LB and vice versa,
+            # so pull in the other side of the join for the changed rows only.
+            lb_instances = set(lb.instance_id for lb in lbs)
+            port_instances = set(port.instance_id for port in ports)
+            for instance_id in (port_instances | waiting) - lb_instances:
+                if instance_id is not None:
+                    lbs.extend(Loadbalancer.objects.filter(instance_id=instance_id))
+
+            for instance_id in (lb_instances | waiting) - port_instances:
+                if instance_id is not None:
+                    ports.extend(Port.objects.filter(instance_id=instance_id))
+
+        port_map = index_ports_by_instance(ports)
+        waiting = set(lb.instance_id for lb in lbs
+                      if lb.instance_id is not None and not getattr(port_map.get(lb.instance_id), 'ip', None))
 
         if len(lbs) == 0:
             continue
 
-        ports = Port.objects.all()
-        slog.info("ports.count = %s" % len(ports))
+        for lb, ip in find_vip_mismatches(lbs, port_map):
+            slog.info("instance_id=%s, lb.vip_address=%s, port.ip=%s"
+                      % (lb.instance_id, lb.vip_address, ip))
+
+            update_lb_vip_addr(lb, ip)
+
+
+def parse_timestamp(stamp):
+    # get_extra_attributes always writes "%Y-%m-%d %H:%M:%S", so slicing the
+    # fields out is enough; anything else goes through strptime.
+    if len(stamp) == 19 and stamp[4] == '-' and stamp[7] == '-' and stamp[10] == ' ' and stamp[13] == ':' and stamp[16] == ':':
+        return calendar.timegm((int(stamp[0:4]), int(stamp[5:7]), int(stamp[8:10]),
+                                int(stamp[11:13]), int(stamp[14:16]), int(stamp[17:19]), 0, 0, 0))
+
+    return calendar.timegm(datetime.datetime.strptime(stamp, "%Y-%m-%d %H:%M:%S").timetuple())
 
-        for port in ports:
-            port_info = {}
-            port_info['instance_id'] = port.instance_id
-            port_info['ip'] = port.ip
-            slog.info("[Port] port.instance_id=%s, port.ip=%s" % (port.instance_id, port.ip))
-            ports_list.append(port_info)
 
-        for lb in lbs_list:
-            for port in ports_list:
-                if lb['instance_id'] == port['instance_id'] and lb['vip_address'] != port['ip']:
-                    slog.info("instance_id=%s, lb.vip_address=%s, port.ip=%s"
-                              % (lb['instance_id'], lb['vip_address'], port['ip']))
+def parse_status_tag(value):
+    userdata = json.loads(value)
 
-                    update_lb_vip_addr(lb['instance_id'], port['ip'])
+    status = {}
+    status['result'] = userdata.get('result')
+    status['expected_result'] = userdata.get('expected_result')
+    status['elapsed'] = parse_timestamp(userdata['update_date']) - parse_timestamp(userdata['create_date'])
+
+    return status
+
+
+class StatusTagCache(object):
+    """LRU cache of parsed chk_container_status values keyed on the tag id
+    and its raw value, so an unchanged tag is never parsed twice."""
+
+    def __init__(self, size=TAG_CACHE_SIZE):
+        self.size = size
+        self.entries = collections.OrderedDict()
+
+    def get(self, tag):
+        key = (tag.id, tag.value)
+        try:
+            status = self.entries.pop(key)
+        except KeyError:
+            status = parse_status_tag(tag.value)
+            if len(self.entries) >= self.size:
+                self.entries.popitem(last=False)
+
+        self.entries[key] = status
+        return status
+
+
+tag_cache = StatusTagCache()
+
+
+def get_provisioning_status(ins, tag):
+    if ins.backend_code == 0:
+        return "PENDING_UPDATE"
+
+    if ins.backend_code == 1 and tag.value == "":
+        return "PENDING_UPDATE"
+
+    try:
+        userdata = tag_cache.get(tag)
+    except Exception as err:
+        slog.error("Error: json.loads() failed (%s)" % str(err))
+        return ""
+
+    if ins.backend_code == 1:
+        if userdata['result'] == "Initialized":
+            return "PENDING_UPDATE"
+        elif userdata['expected_result'] != userdata['result'] and userdata['elapsed'] > 30:
+            return "ERROR"
+        else:
+            return "ACTIVE"
+    else:
+        if userdata['elapsed'] < 30:
+            return "PENDING_UPDATE"
+        else:
+            return "ERROR"
+
+
+def save_provisioning_status(lbs):
+    for lb in lbs:
+        try:
+            lb.save(update_fields=['provisioning_status'])
+            slog.info("instance_id=%s, lb.provisioning_status=%s" % (lb.instance_id, lb.provisioning_status))
+        except Exception as err:
+            slog.error("Error: lb.save() failed (instance_id=%s, %s)" % (lb.instance_id, str(err)))
 
 
 def check_instance_status():
+    feed = ChangeFeed()
+
+    # Tag and LB of every LB instance, keyed on the instance id. Both are
+    # read in full by the sweep and kept current from the feed in between.
+    tag_map = {}
+    lb_map = {}
+
+    # LB instances whose status is still PENDING_UPDATE. The synchronizer
+    # moves their backend_code and writes their tag without moving
+    # `updated`, so they are re-read on every poll. ACTIVE and ERROR are
+    # settled and only re-evaluated when a row of theirs shows up in the
+    # feed, or by the next sweep.
+    unsettled = set()
+
     while True:
-        time.sleep(5)
-        instances = Instance.objects.all()
-        slog.info("instances.count = %s" % len(instances))
-
-        for ins in instances:
-            tag = ""
-            provisioning_status = ""
-
-            try:
-                tag = Tag.objects.get(object_id=ins.id, name="chk_container_status")
-            except Exception as err:
-                slog.error("Error: object_id(%s) does not exist in Tag table (%s)" % (ins.id, str(err)))
+        time.sleep(POLL_INTERVAL)
+        full = feed.start_cycle()
+
+        instances = dict((ins.id, ins) for ins in feed.fetch(Instance, full))
+        tags = list(feed.fetch(Tag, full, name="chk_container_status"))
+        lbs = list(feed.fetch(Loadbalancer, full))
+
+        if full:
+            tag_map = {}
+            lb_map = {}
+        tag_map.update((tag.object_id, tag) for tag in tags)
+        lb_map.update((lb.instance_id, lb) for lb in lbs if lb.instance_id is not None)
+
+        if not full:
+            # The status is derived from the instance, its tag and its LB,
+            # so a change to any of them means a re-evaluation.
+            changed_tags = set(tag.object_id for tag in tags)
+            stale = unsettled | changed_tags | set(lb.instance_id for lb in lbs)
+            stale.intersection_update(lb_map)
+
+            for ins in read_by_id(Instance, stale - set(instances), "id"):
+                instances[ins.id] = ins
+
+            reread = set(instance_id for instance_id in stale if instance_id not in tag_map)
+            reread.update(unsettled & stale)
+            for tag in read_by_id(Tag, reread - changed_tags, "object_id", name="chk_container_status"):
+                tag_map[tag.object_id] = tag
+
+            # Instances that no longer exist or host no LB.
+            unsettled.intersection_update(instances)
+            unsettled.intersection_update(lb_map)
+
+        slog.info("full=%s, instances.count = %s" % (full, len(instances)))
+
+        changed = []
+        for ins in instances.values():
+            lb = lb_map.get(ins.id)
+            if lb is None:
+                slog.error("Error: instance_id(%s) does not exist in Loadbalancer table" % ins.id)
+                unsettled.discard(ins.id)
+                continue
+
+            tag = tag_map.get(ins.id)
+            if tag is None:
+                slog.error("Error: object_id(%s) does not exist in Tag table" % ins.id)
+                unsettled.add(ins.id)
                 continue
 
-            if ins.backend_code == 0:
-                provisioning_status = "PENDING_UPDATE"
-
-            elif ins.backend_code == 1:
-                if tag.value == "":
-                    provisioning_status = "PENDING_UPDATE"
-                else:
-                    try:
-                        userdata = json.loads(tag.value)
-                        create_timestamp = time.mktime(datetime.datetime.strptime(userdata['create_date'], "%Y-%m-%d %H:%M:%S").timetuple())
-                        update_timestamp = time.mktime(datetime.datetime.strptime(userdata['update_date'], "%Y-%m-%d %H:%M:%S").timetuple())
-
-                        if userdata['result'] == "Initialized":
-                            provisioning_status = "PENDING_UPDATE"
-                        elif userdata['expected_result'] != userdata['result'] and (float(update_timestamp) - float(create_timestamp)) > 30:
-                            provisioning_status = "ERROR"
-                        else:
-                            provisioning_status = "ACTIVE"
-                    except Exception as err:
-                        slog.error("Error: json.loads() failed (%s)" % str(err))
+            provisioning_status = get_provisioning_status(ins, tag)
+            if provisioning_status in ("ACTIVE", "ERROR"):
+                unsettled.discard(ins.id)
             else:
-                try:
-                    userdata = json.loads(tag.value)
-                    create_timestamp = time.mktime(datetime.datetime.strptime(userdata['create_date'], "%Y-%m-%d %H:%M:%S").timetuple())
-                    update_timestamp = time.mktime(datetime.datetime.strptime(userdata['update_date'], "%Y-%m-%d %H:%M:%S").timetuple())
-
-                    if (float(update_timestamp) - float(create_timestamp)) < 30:
-                        provisioning_status = "PENDING_UPDATE"
-                    else:
-                        provisioning_status = "ERROR"
-                except Exception as err:
-                    slog.error("Error: json.loads() failed (%s)" % str(err))
-
-            try:
-                lb = Loadbalancer.objects.get(tenantwithcontainer_ptr_id=ins.id)
+                unsettled.add(ins.id)
+
+            if lb.provisioning_status != provisioning_status:
                 lb.provisioning_status = provisioning_status
-                lb.save()
-                slog.info("id=%s, instance_name=%s, lb.provisioning_status=%s"
-                          % (ins.id, ins.instance_name, lb.provisioning_status))
-            except Exception as err:
-                slog.error("Error: id(%s) does not exist in Loadbalancer table (%s)" % (ins.id, str(err)))
+                changed.append(lb)
+
+        save_provisioning_status(changed)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,197 @@
+
+# Copyright 2017-present Open Networking Foundation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import copy
+import os
+import socket
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+import haproxy_runtime
+
+
+# What haproxy answers when these commands succeed; the others get an
+# empty line.
+SUCCESS_REPLIES = {"add server": "New server registered.",
+                   "del server": "Server deleted.",
+                   " addr ": "IP changed from '10.0.0.1' to '10.0.0.2', port changed from '80' to '8080' "
+                             "by 'stats socket command'"}
+
+
+class StubRuntimeServer(object):
+    """Stands in for haproxy's runtime API: answers one command per
+    connection, records it, and replies with the first entry of `replies`
+    whose key occurs in the command."""
+
+    def __init__(self, replies=None):
+        self.replies = dict(SUCCESS_REPLIES, **(replies or {}))
+        self.commands = []
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, addr = self.sock.accept()
+            except socket.error:
+                return
+
+            try:
+                data = b""
+                while not data.endswith(b"\n"):
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        break
+                    data += chunk
+
+                command = data.decode("utf-8").strip()
+                self.commands.append(command)
+
+                reply = ""
+                for key, text in self.replies.items():
+                    if key in command:
+                        reply = text
+                        break
+                conn.sendall((reply + "\n").encode("utf-8"))
+            finally:
+                conn.close()
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        self.sock.close()
+        self.thread.join(2)
+
+
+def make_member(member_id, weight=1, admin_state_up=True, address="10.0.0.1", protocol_port=80):
+    return {'member_id': member_id,
+            'address': address,
+            'protocol_port': protocol_port,
+            'weight': weight,
+            'admin_state_up': admin_state_up}
+
+
+def make_context(members):
+    return {'loadbalancer': {'loadbalancer_id': 'lb-1', 'vip_address': '10.0.0.100'},
+            'listeners': [{'listener_id': 'listener-1', 'protocol': 'HTTP', 'protocol_port': 80,
+                           'default_pool_id': 'pool-1'}],
+            'pools': [{'pool_id': 'pool-1',
+                       'protocol': 'HTTP',
+                       'lb_algorithm': 'ROUND_ROBIN',
+                       'member_connection_limit': -1,
+                       'member_queue_limit': -1,
+                       'health_monitor': {'type': 'HTTP', 'delay': 5, 'max_retries': 3},
+                       'members': members}]}
+
+
+class TestMemberChanges(unittest.TestCase):
+    def test_unchanged(self):
+        old = make_context([make_member('m1')])
+        self.assertEqual(haproxy_runtime.get_member_changes(old, copy.deepcopy(old)), [])
+
+    def test_member_changes(self):
+        old = make_context([make_member('m1'), make_member('m2'), make_member('m3')])
+        new = make_context([make_member('m1', weight=5), make_member('m2', admin_state_up=False),
+                            make_member('m4', address="10.0.0.4")])
+
+        changes = haproxy_runtime.get_member_changes(old, new)
+        self.assertEqual(sorted((op, member['member_id']) for op, pool, member in changes),
+                         [('add', 'm4'), ('del', 'm3'), ('state', 'm2'), ('weight', 'm1')])
+
+    def test_structural_changes(self):
+        old = make_context([make_member('m1')])
+
+        new = copy.deepcopy(old)
+        new['listeners'][0]['protocol_port'] = 8080
+        self.assertIsNone(haproxy_runtime.get_member_changes(old, new))
+
+        new = copy.deepcopy(old)
+        new['pools'][0]['lb_algorithm'] = 'LEAST_CONNECTIONS'
+        self.assertIsNone(haproxy_runtime.get_member_changes(old, new))
+
+        new = copy.deepcopy(old)
+        new['pools'][0]['pool_id'] = 'pool-2'
+        self.assertIsNone(haproxy_runtime.get_member_changes(old, new))
+
+
+class TestRuntimeAPI(unittest.TestCase):
+    def setUp(self):
+        self.server = StubRuntimeServer()
+        self.api = haproxy_runtime.RuntimeAPI("127.0.0.1", self.server.port)
+
+    def tearDown(self):
+        self.server.close()
+
+    def apply(self, old_members, new_members):
+        changes = haproxy_runtime.get_member_changes(make_context(old_members), make_context(new_members))
+        haproxy_runtime.apply_member_changes(self.api, changes)
+        return self.server.commands
+
+    def test_weight(self):
+        commands = self.apply([make_member('m1')], [make_member('m1', weight=10)])
+        self.assertEqual(commands, ["set server pool-1/m1 weight 10"])
+
+    def test_disable_and_enable(self):
+        commands = self.apply([make_member('m1')], [make_member('m1', admin_state_up=False)])
+        self.assertEqual(commands, ["set server pool-1/m1 state maint"])
+
+        del self.server.commands[:]
+        commands = self.apply([make_member('m1', admin_state_up=False)], [make_member('m1')])
+        self.assertEqual(commands, ["set server pool-1/m1 state ready"])
+
+    def test_address(self):
+        commands = self.apply([make_member('m1')], [make_member('m1', address="10.0.0.2", protocol_port=8080)])
+        self.assertEqual(commands, ["set server pool-1/m1 addr 10.0.0.2 port 8080"])
+
+    def test_add(self):
+        commands = self.apply([], [make_member('m1', weight=3)])
+        self.assertEqual(commands, ["add server pool-1/m1 10.0.0.1:80 weight 3 check inter 5s fall 3",
+                                    "enable health pool-1/m1",
+                                    "set server pool-1/m1 state ready"])
+
+    def test_delete(self):
+        commands = self.apply([make_member('m1')], [])
+        self.assertEqual(commands, ["set server pool-1/m1 state maint",
+                                    "del server pool-1/m1"])
+
+    def test_error_reply(self):
+        self.server.replies["add server"] = "Unknown command. Please enter one of the following commands only :"
+        self.assertRaises(haproxy_runtime.RuntimeAPIError, self.apply, [], [make_member('m1')])
+
+    def test_unknown_reply(self):
+        # haproxy 2.6 on a pool with a static balance algorithm.
+        self.server.replies["add server"] = "Backend must use a dynamic load balancing to support dynamic servers."
+        self.assertRaises(haproxy_runtime.RuntimeAPIError, self.apply, [], [make_member('m1')])
+
+        self.server.replies["set server"] = "Require 'backend/server'."
+        self.assertRaises(haproxy_runtime.RuntimeAPIError, self.apply, [make_member('m1')], [make_member('m1', weight=2)])
+
+    def test_connection_refused(self):
+        self.server.close()
+        self.assertRaises(socket.error, self.apply, [make_member('m1')], [make_member('m1', weight=2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 
+import re
 import uuid
 
 from service import XOSService
@@ -21,11 +22,15 @@ from xosresource import XOSResource
 from core.models import Service
 from services.lbaas.models import Loadbalancer, Listener, Pool, Member, Healthmonitor
 
+# Same check as the REST API and the synchronizer: the ref names a file in
+# the certificate store, so it must not contain a path.
+TLS_REF_PATTERN = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9._-]*\Z")
+
 
 class LbaasLoadbalancer(XOSResource):
     provides = "tosca.nodes.Loadbalancer"
     xos_model = Loadbalancer
-    copyin_props = ("loadbalancer_id", "ptr_listener_id", "ptr_pool_id", "description", "vip_subnet_id", "vip_address", "slice_name", "admin_state_up", "operating_status", "provisioning_status")
+    copyin_props = ("loadbalancer_id", "ptr_listener_id", "ptr_pool_id", "description", "vip_subnet_id", "vip_address", "slice_name", "admin_state_up", "operating_status", "provisioning_status", "max_connections", "nbthread", "cpu_set", "tls_session_cache_size", "tls_session_lifetime")
 
     def get_xos_args(self, throw_exception=True):
         args = super(LbaasLoadbalancer, self).get_xos_args()
@@ -67,7 +72,7 @@ class LbaasLoadbalancer(XOSResource):
 class LbaasListener(XOSResource):
     provides = "tosca.nodes.Listener"
     xos_model = Listener
-    copyin_props = ("listener_id", "protocol", "protocol_port", "stat_port", "description", "admin_state_up", "connection_limit", )
+    copyin_props = ("listener_id", "protocol", "protocol_port", "stat_port", "description", "admin_state_up", "connection_limit", "timeout_client_data", "keepalive_mode", "default_tls_container_ref", "cache_size_mb", "cache_max_age", "cache_max_object_size", "compression_types", )
 
     def get_xos_args(self, throw_exception=True):
         args = super(LbaasListener, self).get_xos_args()
@@ -77,6 +82,10 @@ class LbaasListener(XOSResource):
         if "listener_id" not in args:
             args["listener_id"] = str(uuid.uuid4())
 
+        ref = args.get("default_tls_container_ref")
+        if ref and not TLS_REF_PATTERN.match(ref):
+            raise Exception("default_tls_container_ref may only contain letters, digits, '.', '_' and '-' (%s)" % ref)
+
         return args
 
     def get_existing_objs(self):
@@ -96,7 +105,7 @@ class LbaasListener(XOSResource):
 class LbaasPool(XOSResource):
     provides = "tosca.nodes.Pool"
     xos_model = Pool
-    copyin_props = ("pool_id", "health_monitor_id", "ptr_health_monitor_id", "lb_algorithm", "description", "protocol", "admin_state_up", "status")
+    copyin_props = ("pool_id", "health_monitor_id", "ptr_health_monitor_id", "lb_algorithm", "description", "protocol", "admin_state_up", "status", "timeout_member_connect", "timeout_member_data", "member_connection_limit", "member_queue_limit", "http_reuse")
 
     def get_xos_args(self, throw_exception=True):
         args = super(LbaasPool, self).get_xos_args()